@@ -1,5 +1,163 @@
-from django.contrib import admin
+import hashlib
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Q
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
 
 from .models import Note
 
-admin.site.register(Note)
+# Верхняя граница для префиксного поиска диапазоном по индексу.
+MAX_CHAR = '\U0010ffff'
+
+
+def estimated_count(queryset):
+    """
+    Оценка числа строк таблицы по статистике планировщика SQLite.
+
+    Первое число в sqlite_stat1.stat - число строк таблицы на момент
+    последнего ANALYZE или PRAGMA optimize (см. notes.maintenance).
+    None, если статистики нет.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        # Таблица sqlite_stat1 появляется после первого ANALYZE.
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        )
+        if cursor.fetchone() is None:
+            return None
+        cursor.execute(
+            'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return int(row[0].split()[0]) if row else None
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator для больших таблиц.
+
+    Для списка без фильтров число записей берётся из статистики
+    планировщика - без COUNT(*). Для отфильтрованного списка, а также
+    пока статистики нет, точный COUNT(*) кешируется на
+    ADMIN_COUNT_CACHE_TTL секунд: на большой таблице подсчёт дороже
+    самой страницы, а число записей за минуту почти не меняется.
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = estimated_count(self.object_list)
+            if estimate is not None:
+                return estimate
+        query = str(self.object_list.query)
+        key = 'admin-count:' + hashlib.md5(query.encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, settings.ADMIN_COUNT_CACHE_TTL)
+        return count
+
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    list_display = ('id', 'title', 'slug', 'author')
+    list_select_related = ('author',)
+    list_per_page = 100
+    ordering = ('-pk',)
+    raw_id_fields = ('author',)
+    search_fields = ('slug', 'title')
+    search_help_text = 'Точный адрес заметки или начало заголовка.'
+    show_full_result_count = False
+    paginator = CachedCountPaginator
+    actions = ('delete_in_batches',)
+    delete_batch_size = 1000
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name == 'notes_note_changelist':
+            # В списке текст не показывается, незачем его читать.
+            queryset = queryset.defer('text')
+        return queryset
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Поиск, который использует индексы: slug по точному совпадению,
+        заголовок по префиксу через диапазон вместо LIKE.
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        condition = Q(slug=term)
+        for prefix in {term, term[:1].upper() + term[1:]}:
+            condition |= Q(title__gte=prefix, title__lt=prefix + MAX_CHAR)
+        return queryset.filter(condition), False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Стандартное удаление загружает все выбранные объекты разом ради
+        # страницы подтверждения, на большой таблице это неприемлемо.
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(
+        description='Удалить выбранные заметки пакетами',
+        permissions=('delete',),
+    )
+    def delete_in_batches(self, request, queryset):
+        """
+        Удаляет выбранное пакетами по delete_batch_size после
+        подтверждения. Страница подтверждения показывает только число
+        заметок и не загружает их.
+        """
+        if request.POST.get('post') != 'yes':
+            return self.confirm_delete_in_batches(request, queryset)
+        deleted = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                queryset.filter(pk__gt=last_pk).order_by('pk').values_list(
+                    'pk', flat=True
+                )[:self.delete_batch_size]
+            )
+            if not pks:
+                break
+            batch = Note.objects.filter(pk__in=pks)
+            with transaction.atomic():
+                # Как delete_selected: удаление попадает в историю админки.
+                self.log_deletions(request, batch.only('pk', 'title'))
+                deleted += batch.delete()[1].get(Note._meta.label, 0)
+            last_pk = pks[-1]
+        self.message_user(
+            request, f'Удалено заметок: {deleted}.', messages.SUCCESS
+        )
+
+    def confirm_delete_in_batches(self, request, queryset):
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Удалить заметки?',
+            'opts': self.model._meta,
+            'media': self.media,
+            'count': queryset.count(),
+            # При «выбрать все» выбранное задаёт select_across и фильтры
+            # списка в адресе страницы, а не перечень id.
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        request.current_app = self.admin_site.name
+        return TemplateResponse(
+            request,
+            'admin/notes/note/delete_in_batches_confirmation.html',
+            context,
+        )
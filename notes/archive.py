@@ -0,0 +1,104 @@
+"""
+Перенос давно не изменявшихся заметок в архивную БД.
+
+Текст заметки сжимается zlib и записывается в ArchivedText в отдельной
+БД archive, а в основной таблице остаются пустой текст и флаг archived.
+Заголовок, slug и автор остаются на месте, поэтому списки и поиск
+работают как прежде. Текст подгружается из архива при первом обращении
+(BodyTextDescriptor), а правка заметки возвращает его в основную таблицу.
+
+Между двумя БД нет общей транзакции, поэтому порядок записей выбран так,
+чтобы текст не потерялся при сбое: сначала коммит в архив, потом
+очистка основной таблицы; при восстановлении - наоборот.
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from .models import ArchivedText, Note, NoteBody
+from .routers import ARCHIVE_DB
+
+
+def archive_candidates(days):
+    cutoff = timezone.now() - timedelta(days=days)
+    return Note.objects.filter(archived=False, updated_at__lt=cutoff)
+
+
+def archive_batch(pks):
+    """Переносит тексты заметок с указанными id, возвращает их число."""
+    notes = list(
+        Note.objects.filter(pk__in=pks, archived=False).select_related('body')
+    )
+    if not notes:
+        return 0
+    with transaction.atomic(using=ARCHIVE_DB):
+        ArchivedText.objects.bulk_create(
+            [ArchivedText.pack(note.pk, note.text) for note in notes],
+            update_conflicts=True,
+            unique_fields=('note_id',),
+            update_fields=('data', 'size', 'archived_at'),
+        )
+    skipped = []
+    with transaction.atomic():
+        # Заметка могла измениться, пока текст писался в архив: такие
+        # пропускаем.
+        for note in notes:
+            if not Note.objects.filter(
+                pk=note.pk, version=note.version, updated_at=note.updated_at
+            ).update(text='', body=None, archived=True):
+                skipped.append(note.pk)
+                continue
+            if note.body_id:
+                NoteBody.release(note.body_id)
+    if skipped:
+        # Их копии в архиве сразу удаляем: сигнал при удалении заметки
+        # чистит архив только у заметок с флагом archived, и копия
+        # осталась бы навсегда.
+        hot = Note.objects.filter(pk__in=skipped, archived=False)
+        ArchivedText.objects.filter(
+            note_id__in=list(hot.values_list('pk', flat=True))
+        ).delete()
+    return len(notes) - len(skipped)
+
+
+def archive_notes(days, batch_size=500):
+    """Переносит в архив порциями по batch_size, возвращает число заметок."""
+    pending = archive_candidates(days).order_by('pk')
+    archived = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            pending.filter(pk__gt=last_pk).values_list('pk', flat=True)[
+                :batch_size
+            ]
+        )
+        if not pks:
+            return archived
+        archived += archive_batch(pks)
+        last_pk = pks[-1]
+
+
+def hot_table_stats():
+    """
+    Размер таблицы заметок в основной БД по dbstat: число страниц и
+    занятые на них байты.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT count(*), coalesce(sum(pgsize - unused), 0) FROM dbstat '
+            'WHERE name = %s',
+            [Note._meta.db_table],
+        )
+        pages, used = cursor.fetchone()
+    text = Note.objects.aggregate(size=Sum(Length('text')))['size'] or 0
+    return {'pages': pages, 'bytes': used, 'text': text}
+
+
+def archive_stats():
+    """Сколько заметок в архиве, их исходный и сжатый размер в байтах."""
+    return ArchivedText.objects.aggregate(
+        notes=Count('pk'), size=Sum('size'), stored=Sum(Length('data'))
+    )
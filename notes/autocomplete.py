@@ -0,0 +1,140 @@
+"""
+Подсказки заголовков заметок из индекса в памяти процесса.
+
+Для каждого пользователя строится отсортированный список ключей: заголовок
+с каждого слова, в нижнем регистре, плюс его транслитерация. Поиск по
+префиксу - бинарный поиск по этому списку, без запросов к БД.
+
+Индексы загружаются при первом запросе пользователя, их число ограничено
+AUTOCOMPLETE_MAX_USERS (вытесняются давно не использованные). Сигналы
+сохранения и удаления заметки обновляют индекс в текущем процессе, а
+AUTOCOMPLETE_TTL ограничивает устаревание индексов в остальных.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import Note
+
+MAX_KEYS_PER_TITLE = 10
+
+
+def normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def title_keys(title):
+    """Ключи заголовка: с каждого слова, как есть и в транслитерации."""
+    from pytils.translit import translify
+
+    keys = set()
+    for variant in (title, translify(title, strict=False)):
+        words = normalize(variant).split(' ')
+        for start in range(min(len(words), MAX_KEYS_PER_TITLE)):
+            keys.add(' '.join(words[start:]))
+    keys.discard('')
+    return keys
+
+
+def user_titles(user_id):
+    """Запрос, из которого строится индекс пользователя."""
+    return Note.objects.filter(author_id=user_id).values_list(
+        'pk', 'title', 'slug'
+    )
+
+
+class PrefixIndex:
+    """Заголовки заметок одного пользователя."""
+
+    def __init__(self, notes=()):
+        self._keys = []
+        self._notes = {}
+        for pk, title, slug in notes:
+            self._notes[pk] = (title, slug)
+            self._keys.extend((key, pk) for key in title_keys(title))
+        self._keys.sort()
+
+    def __len__(self):
+        return len(self._notes)
+
+    def add(self, pk, title, slug):
+        self.remove(pk)
+        self._notes[pk] = (title, slug)
+        for key in title_keys(title):
+            insort(self._keys, (key, pk))
+
+    def remove(self, pk):
+        note = self._notes.pop(pk, None)
+        if note is None:
+            return
+        for key in title_keys(note[0]):
+            position = bisect_left(self._keys, (key, pk))
+            if position < len(self._keys) and self._keys[position] == (
+                key, pk
+            ):
+                del self._keys[position]
+
+    def search(self, prefix, limit=10):
+        """Заметки, у которых какой-то ключ начинается с prefix."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        found = {}
+        position = bisect_left(self._keys, (prefix,))
+        while position < len(self._keys) and len(found) < limit:
+            key, pk = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            found.setdefault(pk, self._notes[pk])
+            position += 1
+        return list(found.values())
+
+
+class AutocompleteCache:
+    """Индексы пользователей с вытеснением по LRU и сроком жизни."""
+
+    def __init__(self):
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._indexes.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._indexes.move_to_end(user_id)
+                return entry[1]
+        index = PrefixIndex(user_titles(user_id).iterator())
+        with self._lock:
+            self._indexes[user_id] = (now + settings.AUTOCOMPLETE_TTL, index)
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > settings.AUTOCOMPLETE_MAX_USERS:
+                self._indexes.popitem(last=False)
+        return index
+
+    def search(self, user_id, prefix, limit=10):
+        index = self.get(user_id)
+        with self._lock:
+            return index.search(prefix, limit)
+
+    def note_saved(self, note):
+        with self._lock:
+            entry = self._indexes.get(note.author_id)
+            if entry is not None:
+                entry[1].add(note.pk, note.title, note.slug)
+
+    def note_deleted(self, author_id, pk):
+        with self._lock:
+            entry = self._indexes.get(author_id)
+            if entry is not None:
+                entry[1].remove(pk)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+titles = AutocompleteCache()
@@ -0,0 +1,52 @@
+"""Бэкенд аутентификации с кешем пользователей в памяти процесса."""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+_users = OrderedDict()
+_lock = threading.Lock()
+
+
+def invalidate_user(user_id):
+    """Удаляет пользователя из кеша процесса."""
+    with _lock:
+        _users.pop(user_id, None)
+
+
+def clear_user_cache():
+    """Полностью очищает кеш пользователей."""
+    with _lock:
+        _users.clear()
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который не ходит в БД за пользователем на каждый запрос.
+
+    Пользователь кешируется на USER_CACHE_TTL секунд, размер кеша
+    ограничен USER_CACHE_MAX_SIZE (вытесняются давно не запрошенные).
+    При изменении или удалении пользователя запись сбрасывается сигналом.
+    """
+
+    def get_user(self, user_id):
+        ttl = settings.USER_CACHE_TTL
+        now = time.monotonic()
+        with _lock:
+            entry = _users.get(user_id)
+            if entry is not None and entry[0] > now:
+                _users.move_to_end(user_id)
+                # Отдаём копию, чтобы запросы не делили один объект.
+                return copy.copy(entry[1])
+        user = super().get_user(user_id)
+        if user is not None and ttl > 0:
+            with _lock:
+                _users[user_id] = (now + ttl, user)
+                _users.move_to_end(user_id)
+                while len(_users) > settings.USER_CACHE_MAX_SIZE:
+                    _users.popitem(last=False)
+            return copy.copy(user)
+        return user
@@ -0,0 +1,50 @@
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+
+class BodyTextDescriptor(DeferredAttribute):
+    """
+    Подгружает текст из NoteBody или из архива, если в строке заметки он
+    не хранится.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if value:
+            return value
+        if instance.body_id:
+            value = instance.body.text
+        elif instance.archived:
+            value = instance.archived_text()
+        else:
+            return value
+        instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        # С __set__ дескриптор срабатывает и тогда, когда значение уже
+        # лежит в __dict__ экземпляра.
+        instance.__dict__[self.field.attname] = value
+
+
+class BodyTextField(models.TextField):
+    """
+    Текст заметки, который может храниться в общей таблице NoteBody.
+
+    Если у заметки есть body, в её собственную строку пишется пустая
+    строка, а при чтении текст берётся из body.
+    """
+
+    descriptor_class = BodyTextDescriptor
+
+    def pre_save(self, model_instance, add):
+        value = super().pre_save(model_instance, add)
+        return '' if model_instance.body_id else value
+
+    def deconstruct(self):
+        # Для схемы БД это обычный TextField: миграциям незачем
+        # пересоздавать таблицу заметок из-за смены класса поля.
+        name, _, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.TextField', args, kwargs
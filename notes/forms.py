@@ -1,25 +1,35 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
 from .models import Note
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
+CONFLICT = ('Заметку успели изменить в другом окне. Обновите страницу, '
+            'чтобы не потерять чужие правки.')
 
 
 class NoteForm(forms.ModelForm):
     """Форма для создания или обновления заметки."""
 
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
     class Meta:
         model = Note
-        fields = ('title', 'text', 'slug')
+        fields = ('title', 'text', 'slug', 'is_public')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Версия, с которой начато редактирование, для проверки при
+        # сохранении.
+        self.fields['version'].initial = self.instance.version
 
     def clean_slug(self):
         """Обрабатывает случай, если slug не уникален."""
         cleaned_data = super().clean()
         slug = cleaned_data.get('slug')
         if not slug:
+            from pytils.translit import slugify
+
             title = cleaned_data.get('title')
             slug = slugify(title)[:100]
         if Note.objects.filter(
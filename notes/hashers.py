@@ -0,0 +1,51 @@
+"""
+Хешеры паролей с параметрами из настроек PASSWORD_HASHER_PARAMS.
+
+Параметры читаются при каждом обращении, поэтому их можно менять без
+правки кода. Если у сохранённого хеша параметры отличаются от текущих,
+Django пересчитает его при следующем успешном входе пользователя.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+def _param(name):
+    return settings.PASSWORD_HASHER_PARAMS[name]
+
+
+class TunedPBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+
+    @property
+    def iterations(self):
+        return _param('PBKDF2_ITERATIONS')
+
+
+class TunedScryptPasswordHasher(hashers.ScryptPasswordHasher):
+
+    @property
+    def work_factor(self):
+        return _param('SCRYPT_WORK_FACTOR')
+
+    @property
+    def block_size(self):
+        return _param('SCRYPT_BLOCK_SIZE')
+
+    @property
+    def parallelism(self):
+        return _param('SCRYPT_PARALLELISM')
+
+
+class TunedArgon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Требует пакет argon2-cffi."""
+
+    @property
+    def time_cost(self):
+        return _param('ARGON2_TIME_COST')
+
+    @property
+    def memory_cost(self):
+        return _param('ARGON2_MEMORY_COST')
+
+    @property
+    def parallelism(self):
+        return _param('ARGON2_PARALLELISM')
@@ -0,0 +1,192 @@
+"""
+Обслуживание БД SQLite без остановки сайта.
+
+- Инкрементальный VACUUM: после удаления заметок освободившиеся страницы
+  остаются в файле (freelist). В режиме auto_vacuum = INCREMENTAL их
+  можно вернуть системе короткими шагами PRAGMA incremental_vacuum(N):
+  каждый шаг - отдельная короткая транзакция, между шагами успевают
+  пройти запросы сайта. Перевести существующую БД в этот режим можно
+  только полным VACUUM, который блокирует её на время перезаписи.
+- Статистика планировщика: PRAGMA optimize с ограничением analysis_limit
+  сам решает, какие таблицы нужно проанализировать, и не читает их
+  целиком.
+- Планы запросов: EXPLAIN QUERY PLAN для запроса каждого представления.
+  Полный просмотр таблицы (SCAN) вместо поиска по индексу (SEARCH)
+  считается регрессией.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.http import HttpRequest
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.views.generic.detail import SingleObjectMixin
+
+from .autocomplete import user_titles
+from .models import Note
+
+INCREMENTAL = 2
+# Индексы заметок, на которые рассчитаны представления.
+EXPECTED_NOTE_INDEXES = (('slug',), ('author_id',))
+# Представления, которые читают БД не через get_queryset(): та же
+# функция, которой пользуются они сами.
+EXTRA_QUERIES = {
+    'notes:autocomplete': lambda user: user_titles(user.pk),
+}
+
+
+def sqlite_aliases():
+    return [
+        alias for alias in connections
+        if connections[alias].vendor == 'sqlite'
+    ]
+
+
+def pragma(cursor, name):
+    cursor.execute(f'PRAGMA {name}')
+    return cursor.fetchone()[0]
+
+
+def file_stats(cursor):
+    """Размер файла БД в страницах и число свободных страниц."""
+    return {
+        'page_size': pragma(cursor, 'page_size'),
+        'pages': pragma(cursor, 'page_count'),
+        'free': pragma(cursor, 'freelist_count'),
+        'auto_vacuum': pragma(cursor, 'auto_vacuum'),
+    }
+
+
+def enable_incremental_vacuum(cursor):
+    """Включает auto_vacuum = INCREMENTAL. Полный VACUUM, блокирует БД."""
+    cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    cursor.execute('VACUUM')
+
+
+def incremental_vacuum(cursor, step_pages=256, max_seconds=5.0, pause=0.05):
+    """
+    Возвращает свободные страницы шагами по step_pages, пока они есть и
+    не вышло max_seconds. Результат - (освобождено страниц, шагов).
+    """
+    if pragma(cursor, 'auto_vacuum') != INCREMENTAL:
+        return 0, 0
+    before = free = pragma(cursor, 'freelist_count')
+    deadline = time.monotonic() + max_seconds
+    steps = 0
+    while free and time.monotonic() < deadline:
+        # execute() делает один шаг прагмы, то есть освобождает одну
+        # страницу; executescript() выполняет её до конца.
+        cursor.executescript(
+            f'PRAGMA incremental_vacuum({int(step_pages)});'
+        )
+        steps += 1
+        remaining = pragma(cursor, 'freelist_count')
+        if remaining >= free:
+            break
+        free = remaining
+        time.sleep(pause)
+    return before - free, steps
+
+
+def optimize(cursor, analysis_limit=400, full=False):
+    """Обновляет статистику планировщика; full - полный ANALYZE."""
+    if full:
+        cursor.execute('ANALYZE')
+        return
+    cursor.execute(f'PRAGMA analysis_limit = {int(analysis_limit)}')
+    cursor.execute('PRAGMA optimize')
+
+
+def missing_note_indexes(connection):
+    """Ожидаемые индексы заметок, которых нет в БД."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, Note._meta.db_table
+        )
+    indexed = {
+        tuple(constraint['columns'])
+        for constraint in constraints.values()
+        if constraint['index'] or constraint['unique']
+        or constraint['primary_key']
+    }
+    return [
+        columns for columns in EXPECTED_NOTE_INDEXES
+        if not any(index[:len(columns)] == columns for index in indexed)
+    ]
+
+
+def iter_patterns(patterns, namespace=None):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(
+                pattern.url_patterns, pattern.namespace or namespace
+            )
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            name = f'{namespace}:{pattern.name}' if namespace else (
+                pattern.name
+            )
+            yield name, pattern
+
+
+def view_querysets():
+    """
+    Пары (имя маршрута, запрос) для представлений проекта.
+
+    Представление создаётся для фиктивного пользователя и slug, запрос
+    строится так же, как в get_object() или get_queryset(), но не
+    выполняется.
+    """
+    user = get_user_model()(pk=0)
+    request = HttpRequest()
+    request.method = 'GET'
+    request.user = user
+    for name, pattern in iter_patterns(get_resolver().url_patterns):
+        kwargs = {key: 'slug' for key in pattern.pattern.converters}
+        if name in EXTRA_QUERIES:
+            yield name, EXTRA_QUERIES[name](user)
+            continue
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if view_class is None or not hasattr(view_class, 'get_queryset'):
+            continue
+        view = view_class()
+        view.setup(request, **kwargs)
+        try:
+            queryset = view.get_queryset()
+        except ImproperlyConfigured:
+            # Представление без модели и запроса, например регистрация.
+            continue
+        if isinstance(view, SingleObjectMixin) and view.slug_url_kwarg in (
+            kwargs
+        ):
+            queryset = queryset.filter(
+                **{view.get_slug_field(): kwargs[view.slug_url_kwarg]}
+            )
+        yield name, queryset
+
+
+def explain(queryset):
+    """Строки EXPLAIN QUERY PLAN запроса."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        # EXPLAIN не сверяет версию схемы, и закешированный драйвером
+        # запрос вернёт старый план после изменения индексов. Версия
+        # схемы в тексте запроса делает ключ кеша новым.
+        version = pragma(cursor, 'schema_version')
+        cursor.execute(
+            f'EXPLAIN QUERY PLAN /* schema {version} */ ' + sql, params
+        )
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def is_regression(detail):
+    return detail.startswith('SCAN ') and detail != 'SCAN CONSTANT ROW'
+
+
+def check_plans():
+    """Список (маршрут, строки плана, есть ли полный просмотр таблицы)."""
+    report = []
+    for name, queryset in view_querysets():
+        plan = explain(queryset)
+        report.append((name, plan, any(map(is_regression, plan))))
+    return report
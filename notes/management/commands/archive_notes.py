@@ -0,0 +1,56 @@
+"""
+Переносит давно не изменявшиеся заметки в архивную БД (notes.archive).
+
+После переноса печатает, насколько уменьшилась таблица заметок. Место
+освобождается внутри страниц и используется новыми записями, но сам
+файл БД уменьшается только после VACUUM.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notes.archive import (
+    archive_candidates, archive_notes, archive_stats, hot_table_stats,
+)
+
+
+class Command(BaseCommand):
+    help = 'Переносит тексты давно не изменявшихся заметок в архив.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Архивировать заметки, которые не менялись столько дней.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--report', action='store_true',
+            help='Только показать, сколько заметок можно архивировать.',
+        )
+
+    def handle(self, *args, **options):
+        before = hot_table_stats()
+        if options['report']:
+            count = archive_candidates(options['days']).count()
+            self.stdout.write(f'Можно архивировать заметок: {count}')
+            self.report(before, before)
+            return
+        archived = archive_notes(options['days'], options['batch_size'])
+        self.stdout.write(f'Перенесено в архив заметок: {archived}')
+        self.report(before, hot_table_stats())
+
+    def report(self, before, after):
+        saved = before['bytes'] - after['bytes']
+        percent = saved / before['bytes'] * 100 if before['bytes'] else 0
+        self.stdout.write(
+            f'Таблица заметок: {before["pages"]} -> {after["pages"]} '
+            f'страниц, занято {before["bytes"]} -> {after["bytes"]} байт '
+            f'(-{percent:.1f}%), текст в строках: {before["text"]} -> '
+            f'{after["text"]} символов.'
+        )
+        stats = archive_stats()
+        size, stored = stats['size'] or 0, stats['stored'] or 0
+        ratio = size / stored if stored else 0
+        self.stdout.write(
+            f'Архив: {stats["notes"]} заметок, {size} байт текста, '
+            f'сжато до {stored} байт ({ratio:.1f}x).'
+        )
@@ -0,0 +1,59 @@
+"""Замер памяти и скорости индекса подсказок заголовков на синтетике."""
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from notes.autocomplete import PrefixIndex
+
+WORDS = (
+    'список', 'покупок', 'план', 'отпуск', 'встреча', 'проект', 'отчёт',
+    'идеи', 'книги', 'рецепт', 'ремонт', 'задачи', 'неделя', 'notes',
+    'meeting', 'draft', 'финансы', 'здоровье', 'учёба', 'работа',
+)
+
+
+class Command(BaseCommand):
+    help = 'Показывает объём памяти и время поиска индекса подсказок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notes', type=int, default=10_000)
+        parser.add_argument('--lookups', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        notes = [
+            (
+                pk,
+                ' '.join(rng.choices(WORDS, k=rng.randint(1, 5))),
+                f'note-{pk}',
+            )
+            for pk in range(options['notes'])
+        ]
+        tracemalloc.start()
+        started = time.perf_counter()
+        index = PrefixIndex(notes)
+        built = time.perf_counter() - started
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f'Индекс на {len(index)} заметок: {size / 1024:.0f} КиБ '
+            f'({size / len(index):.0f} байт на заметку), '
+            f'построен за {built * 1000:.1f} мс'
+        )
+        prefixes = [
+            rng.choice(WORDS)[:rng.randint(1, 4)]
+            for _ in range(options['lookups'])
+        ]
+        timings = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            index.search(prefix)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        quantiles = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            f'Поиск: медиана {statistics.median(timings):.1f} мкс, '
+            f'p99 {quantiles[98]:.1f} мкс'
+        )
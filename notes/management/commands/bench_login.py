@@ -0,0 +1,83 @@
+"""
+Замер пропускной способности входа при обычной нагрузке и под атакой.
+
+Все данные создаются внутри транзакции, которая откатывается в конце,
+поэтому команду можно запускать на рабочей базе.
+"""
+import logging
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.client import Client
+from django.urls import reverse
+
+from notes.ratelimit import reset_limiters
+
+PASSWORD = 'bench-Password-1'
+
+
+class Command(BaseCommand):
+    help = 'Замеряет число входов в секунду с лимитами и без них.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        self.url = reverse('users:login')
+        # Иначе каждый ответ 429 попадает в лог предупреждением.
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        self.stdout.write(f'Хешер: {get_hasher().algorithm}')
+        User = get_user_model()
+        with transaction.atomic():
+            # Хеш считается один раз и переиспользуется всеми пользователями.
+            password = make_password(PASSWORD)
+            users = User.objects.bulk_create(
+                User(username=f'bench-user-{i}', password=password)
+                for i in range(count)
+            )
+            self.report('Обычная нагрузка', self.normal_load, users)
+            self.report('Атака с одного IP', self.attack, users)
+            transaction.set_rollback(True)
+        reset_limiters()
+
+    def report(self, title, scenario, users):
+        reset_limiters()
+        count = len(users)
+        started = time.perf_counter()
+        statuses = scenario(users)
+        elapsed = time.perf_counter() - started
+        rejected = statuses.count(HTTPStatus.TOO_MANY_REQUESTS)
+        self.stdout.write(
+            f'{title}: {count / elapsed:.1f} запросов/с, '
+            f'отклонено лимитом {rejected} из {count}'
+        )
+
+    def normal_load(self, users):
+        """Разные пользователи входят с разных адресов."""
+        return [
+            self.login(user.username, PASSWORD, f'10.0.{i // 250}.{i % 250}')
+            for i, user in enumerate(users)
+        ]
+
+    def attack(self, users):
+        """Перебор пароля одного пользователя с одного адреса."""
+        limits = settings.RATE_LIMITS
+        self.stdout.write(
+            f'Лимиты: IP {limits["ip"]}, имя {limits["username"]}'
+        )
+        return [
+            self.login(users[0].username, f'wrong-{i}', '192.0.2.1')
+            for i in range(len(users))
+        ]
+
+    def login(self, username, password, ip):
+        response = Client(REMOTE_ADDR=ip).post(
+            self.url, {'username': username, 'password': password}
+        )
+        return response.status_code
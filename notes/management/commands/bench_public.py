@@ -0,0 +1,93 @@
+"""
+Замер всплеска запросов к одной публичной заметке.
+
+Запросы идут из нескольких потоков одновременно, у каждого потока своё
+соединение с БД, и считаются все выполненные SQL-запросы. Потокам нужна
+закоммиченная заметка, поэтому пользователь и заметка создаются на время
+замера и удаляются в конце.
+"""
+import threading
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.client import Client
+from django.urls import reverse
+
+from notes.microcache import public_notes
+from notes.models import Note
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Показывает число запросов к БД при всплеске обращений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Запросов на поток.')
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create(
+            username=f'bench-public-{time.time_ns()}'
+        )
+        try:
+            note = Note.objects.create(
+                title='Публичная заметка',
+                text='Текст публичной заметки. ' * 200,
+                slug=f'bench-public-{user.pk}',
+                author=user,
+                is_public=True,
+            )
+            url = reverse('notes:public', args=(note.slug,))
+            self.stdout.write(
+                f'TTL кеша: {settings.PUBLIC_NOTE_CACHE_TTL} с'
+            )
+            public_notes.invalidate(note.slug)
+            self.burst('Холодный кеш', url, options)
+            self.burst('Тёплый кеш', url, options)
+        finally:
+            user.delete()
+
+    def burst(self, title, url, options):
+        counter = QueryCounter()
+        statuses = []
+        start = threading.Barrier(options['threads'])
+
+        def worker():
+            client = Client()
+            start.wait()
+            with connection.execute_wrapper(counter):
+                for _ in range(options['requests']):
+                    statuses.append(client.get(url).status_code)
+            connection.close()
+
+        threads = [
+            threading.Thread(target=worker)
+            for _ in range(options['threads'])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        ok = statuses.count(HTTPStatus.OK)
+        self.stdout.write(
+            f'{title}: {len(statuses)} запросов ({ok} успешных) за '
+            f'{elapsed:.2f} с, {len(statuses) / elapsed:.0f} запросов/с, '
+            f'запросов к БД: {counter.count}'
+        )
@@ -0,0 +1,82 @@
+"""
+Замер объёма ответов и времени до первого байта.
+
+Заметки создаются внутри транзакции, которая откатывается в конце.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.client import Client
+from django.urls import reverse
+
+from notes.middleware import ENCODINGS
+from notes.models import Note
+
+STATIC_FILES = ('css/bootstrap.min.css',)
+
+
+class Command(BaseCommand):
+    help = 'Показывает размер ответов со сжатием и без и время до 1 байта.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notes', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = get_user_model().objects.create(username='bench-wire')
+            Note.objects.bulk_create(
+                Note(
+                    title=f'Заметка {i}',
+                    text='Текст',
+                    slug=f'bench-wire-{i}',
+                    author=user,
+                )
+                for i in range(options['notes'])
+            )
+            client = Client()
+            client.force_login(user)
+            list_url = reverse('notes:list')
+            for url in (
+                reverse('notes:home'), list_url, f'{list_url}?format=stream'
+            ):
+                self.measure_page(client, url)
+            transaction.set_rollback(True)
+        for name in STATIC_FILES:
+            self.measure_static(name)
+
+    def measure_page(self, client, url):
+        for encoding in ('identity', 'gzip'):
+            started = time.perf_counter()
+            response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+            if response.streaming:
+                first_byte = None
+                size = 0
+                for chunk in response.streaming_content:
+                    if first_byte is None:
+                        first_byte = time.perf_counter()
+                    size += len(chunk)
+            else:
+                first_byte = time.perf_counter()
+                size = len(response.content)
+            total = time.perf_counter() - started
+            self.stdout.write(
+                f'{url} [{encoding}]: {size} байт, '
+                f'TTFB {(first_byte - started) * 1000:.1f} мс, '
+                f'всего {total * 1000:.1f} мс'
+            )
+
+    def measure_static(self, name):
+        try:
+            hashed_name = staticfiles_storage.stored_name(name)
+            sizes = [f'исходный {staticfiles_storage.size(hashed_name)}']
+        except (ValueError, FileNotFoundError):
+            self.stdout.write(f'{name}: сначала выполните collectstatic')
+            return
+        for coding, extension in ENCODINGS:
+            if staticfiles_storage.exists(hashed_name + extension):
+                size = staticfiles_storage.size(hashed_name + extension)
+                sizes.append(f'{coding} {size}')
+        self.stdout.write(f'{hashed_name}: ' + ', '.join(sizes) + ' байт')
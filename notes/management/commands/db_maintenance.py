@@ -0,0 +1,115 @@
+"""
+Обслуживание БД, которое можно запускать под нагрузкой (notes.maintenance).
+
+По умолчанию для каждой БД SQLite:
+1. инкрементальный VACUUM короткими шагами в пределах --max-seconds;
+2. обновление статистики планировщика (PRAGMA optimize);
+3. проверка индексов заметок и планов запросов всех представлений.
+
+В конце печатается отчёт: сколько страниц возвращено, какие индексы
+отсутствуют и у каких запросов план превратился в полный просмотр
+таблицы. С --check команда завершается ошибкой, если есть проблемы, -
+удобно для CI и cron.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from notes import maintenance
+from notes.queue import enqueue
+from notes.tasks import optimize_database
+
+
+class Command(BaseCommand):
+    help = 'Инкрементальный VACUUM, статистика и проверка планов запросов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', action='append', dest='databases',
+            help='Алиас БД, можно несколько. По умолчанию все SQLite.',
+        )
+        parser.add_argument('--step-pages', type=int, default=256)
+        parser.add_argument('--max-seconds', type=float, default=5.0)
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Пауза между шагами VACUUM, секунд.',
+        )
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='Полный ANALYZE вместо PRAGMA optimize.',
+        )
+        parser.add_argument(
+            '--enable-incremental', action='store_true',
+            help='Перевести БД в auto_vacuum = INCREMENTAL. Выполняет '
+                 'полный VACUUM и блокирует БД на время перезаписи.',
+        )
+        parser.add_argument(
+            '--schedule', action='store_true',
+            help='Поставить в очередь периодический PRAGMA optimize.',
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Завершиться ошибкой при регрессиях планов или индексов.',
+        )
+
+    def handle(self, *args, **options):
+        aliases = options['databases'] or maintenance.sqlite_aliases()
+        for alias in aliases:
+            self.maintain(alias, options)
+        problems = self.check_indexes() + self.check_plans()
+        if options['schedule']:
+            enqueue(
+                optimize_database,
+                key=optimize_database.task_name,
+                delay=settings.DB_OPTIMIZE_INTERVAL,
+            )
+            self.stdout.write(
+                f'PRAGMA optimize запланирован раз в '
+                f'{settings.DB_OPTIMIZE_INTERVAL} с.'
+            )
+        if problems and options['check']:
+            raise CommandError(f'Найдено проблем: {problems}')
+
+    def maintain(self, alias, options):
+        with connections[alias].cursor() as cursor:
+            if options['enable_incremental']:
+                maintenance.enable_incremental_vacuum(cursor)
+            before = maintenance.file_stats(cursor)
+            reclaimed, steps = maintenance.incremental_vacuum(
+                cursor,
+                options['step_pages'],
+                options['max_seconds'],
+                options['pause'],
+            )
+            maintenance.optimize(cursor, full=options['analyze'])
+            after = maintenance.file_stats(cursor)
+        size = reclaimed * before['page_size'] / 1024
+        self.stdout.write(
+            f'{alias}: {before["pages"]} -> {after["pages"]} страниц, '
+            f'возвращено {reclaimed} ({size:.0f} КиБ) за {steps} шагов, '
+            f'свободно осталось {after["free"]}.'
+        )
+        if after['auto_vacuum'] != maintenance.INCREMENTAL and after['free']:
+            self.stdout.write(
+                '  auto_vacuum выключен: свободные страницы можно вернуть '
+                'только после --enable-incremental (полный VACUUM).'
+            )
+
+    def check_indexes(self):
+        missing = maintenance.missing_note_indexes(
+            connections[DEFAULT_DB_ALIAS]
+        )
+        for columns in missing:
+            self.stdout.write(
+                f'Нет индекса заметок по {", ".join(columns)}.'
+            )
+        return len(missing)
+
+    def check_plans(self):
+        regressions = 0
+        self.stdout.write('Планы запросов представлений:')
+        for name, plan, regression in maintenance.check_plans():
+            regressions += regression
+            status = 'РЕГРЕССИЯ' if regression else 'ok'
+            self.stdout.write(f'  {status:<10}{name}: {"; ".join(plan)}')
+        return regressions
@@ -0,0 +1,68 @@
+"""
+Переводит тексты заметок в режим хранения из NOTES_DEDUPLICATE_BODIES.
+
+При включённой дедупликации тексты переносятся в NoteBody, при
+выключенной - возвращаются в строки заметок. В конце печатается отчёт
+об экономии места.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Length
+
+from notes.models import Note, NoteBody
+
+
+class Command(BaseCommand):
+    help = 'Переносит тексты заметок в общую таблицу NoteBody или обратно.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--report', action='store_true',
+            help='Только показать, сколько места занимают тексты.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['report']:
+            self.migrate_bodies(options['batch_size'])
+        self.report()
+
+    def migrate_bodies(self, batch_size):
+        if settings.NOTES_DEDUPLICATE_BODIES:
+            pending = Note.objects.filter(body__isnull=True).exclude(text='')
+        else:
+            pending = Note.objects.filter(body__isnull=False)
+        moved = 0
+        last_pk = 0
+        while True:
+            # Порции по первичному ключу: каждая - отдельная транзакция.
+            batch = list(
+                pending.filter(pk__gt=last_pk).order_by('pk')[:batch_size]
+            )
+            if not batch:
+                break
+            with transaction.atomic():
+                for note in batch:
+                    note.save(update_fields=('text',))
+            moved += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f'Обработано заметок: {moved}')
+
+    def report(self):
+        inline = Note.objects.aggregate(size=Sum(Length('text')))['size']
+        shared = NoteBody.objects.aggregate(size=Sum(Length('text')))['size']
+        referenced = Note.objects.filter(body__isnull=False).aggregate(
+            size=Sum(Length('body__text'))
+        )['size']
+        inline, shared, referenced = inline or 0, shared or 0, referenced or 0
+        logical = inline + referenced
+        stored = inline + shared
+        saved = logical - stored
+        percent = saved / logical * 100 if logical else 0
+        self.stdout.write(
+            f'Тексты заметок: {logical} символов, хранится {stored} '
+            f'(в заметках {inline}, в NoteBody {shared}). '
+            f'Экономия: {saved} символов, {percent:.1f}%.'
+        )
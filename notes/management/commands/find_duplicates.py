@@ -0,0 +1,65 @@
+"""
+Находит группы почти одинаковых заметок у каждого пользователя.
+
+Сравниваются MinHash-подписи из notes.similarity, попарно - только
+заметки из общих корзин LSH. С --index сначала досчитываются подписи
+заметок, у которых их ещё нет (например, созданных до появления поиска
+похожих).
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from notes.models import Note, NoteSignature
+from notes.similarity import find_clusters, load_signatures, update_signature
+
+
+class Command(BaseCommand):
+    help = 'Показывает группы похожих заметок пользователей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Имя пользователя.')
+        parser.add_argument(
+            '--threshold', type=float, default=settings.SIMILARITY_THRESHOLD
+        )
+        parser.add_argument(
+            '--index', action='store_true',
+            help='Сначала посчитать недостающие подписи.',
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(note__isnull=False)
+        if options['user']:
+            users = users.filter(username=options['user'])
+        for user in users.distinct().order_by('pk').iterator():
+            if options['index']:
+                self.index(user)
+            self.report(user, options['threshold'])
+
+    def index(self, user):
+        missing = Note.objects.filter(author=user, signature__isnull=True)
+        for note in missing.iterator():
+            update_signature(note)
+
+    def report(self, user, threshold):
+        started = time.perf_counter()
+        pks, matrix = load_signatures(
+            NoteSignature.objects.filter(note__author=user).order_by('pk')
+        )
+        clusters = find_clusters(pks, matrix, threshold)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{user.username}: {len(pks)} заметок, групп похожих: '
+            f'{len(clusters)} ({elapsed * 1000:.0f} мс)'
+        )
+        slugs = dict(
+            Note.objects.filter(
+                pk__in=[pk for cluster in clusters for pk in cluster]
+            ).values_list('pk', 'slug')
+        )
+        for cluster in clusters:
+            self.stdout.write(
+                '  ' + ', '.join(slugs[pk] for pk in cluster)
+            )
@@ -0,0 +1,108 @@
+import logging
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from notes import queue
+
+logger = logging.getLogger(__name__)
+
+
+def execute(pk):
+    """Выполняет задачу в потоке или процессе пула."""
+    try:
+        return queue.run_task(pk)
+    finally:
+        close_old_connections()
+
+
+def init_process():
+    # Процесс пула получает копию родителя: соединения с БД не делим.
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--pool', choices=('thread', 'process'), default='thread'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1,
+            help='Пауза между опросами пустой очереди, с.',
+        )
+        parser.add_argument(
+            '--stats-interval', type=float, default=60,
+            help='Как часто печатать глубину очереди и задержку, с.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Только показать состояние очереди.',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.print_stats()
+            return
+        workers = options['workers']
+        if options['pool'] == 'process':
+            connections.close_all()
+            executor = ProcessPoolExecutor(workers, initializer=init_process)
+        else:
+            executor = ThreadPoolExecutor(workers)
+        try:
+            with executor:
+                self.loop(executor, workers, options)
+        except KeyboardInterrupt:
+            self.stdout.write('Остановка воркеров.')
+
+    def loop(self, executor, workers, options):
+        running = {}
+        next_stats = 0
+        while True:
+            if time.monotonic() >= next_stats:
+                queue.requeue_stale(settings.TASK_QUEUE_STALE_TIMEOUT)
+                self.print_stats()
+                next_stats = time.monotonic() + options['stats_interval']
+            for pk in queue.claim(workers - len(running)):
+                running[executor.submit(execute, pk)] = pk
+            if running:
+                done, _ = wait(
+                    running,
+                    timeout=options['poll_interval'],
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    pk = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception:
+                        # Ошибки самих задач run_task записывает в очередь.
+                        # Сюда доходят остальные: строку задачи удалил
+                        # requeue_stale, БД заблокирована дольше timeout.
+                        # Задача с RUNNING вернётся в очередь через
+                        # requeue_stale, воркер продолжает работу.
+                        logger.exception('Сбой воркера на задаче %s', pk)
+            elif options['once']:
+                self.print_stats()
+                return
+            else:
+                time.sleep(options['poll_interval'])
+
+    def print_stats(self):
+        stats = queue.queue_stats()
+        self.stdout.write(
+            'Очередь: {depth} ждут, {running} выполняются, '
+            '{failed} с ошибкой, задержка {lag:.1f} с'.format(**stats)
+        )
@@ -0,0 +1,134 @@
+"""
+Профиль холодного старта воркера.
+
+Запускает чистый интерпретатор с -X importtime, который создаёт
+приложение так же, как yanote/wsgi.py или yanote/asgi.py, и печатает:
+- медиану времени импорта Django, django.setup() и создания приложения
+  по нескольким запускам;
+- пакеты верхнего уровня по суммарному собственному времени импорта;
+- самые дорогие модули по собственному и накопленному времени.
+"""
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+PROBE = '''
+import json, os, sys, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+import django
+imported = time.perf_counter()
+django.setup(set_prefix=False)
+configured = time.perf_counter()
+if sys.argv[1] == 'asgi':
+    from django.core.handlers.asgi import ASGIHandler as Handler
+else:
+    from django.core.handlers.wsgi import WSGIHandler as Handler
+Handler()
+ready = time.perf_counter()
+stats = {
+    'импорт django': imported - started,
+    'django.setup()': configured - imported,
+    'создание приложения': ready - configured,
+}
+if sys.argv[2] == 'warmup':
+    from notes.warmup import warm_up
+    warm_up()
+    stats['прогрев'] = time.perf_counter() - ready
+print(json.dumps(stats))
+'''
+
+
+def run_probe(target, warmup):
+    """Один холодный старт: (этапы в секундах, строки importtime, время)."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [
+            sys.executable, '-X', 'importtime', '-c', PROBE,
+            target, 'warmup' if warmup else '-',
+        ],
+        capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+    )
+    elapsed = time.perf_counter() - started
+    return json.loads(result.stdout), parse_importtime(result.stderr), elapsed
+
+
+def parse_importtime(output):
+    """Строки -X importtime: список (модуль, собственное, накопленное), мкс."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        if own.strip().isdigit():
+            modules.append((name.strip(), int(own), int(cumulative)))
+    return modules
+
+
+class Command(BaseCommand):
+    help = 'Показывает, на что уходит время при старте воркера.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', choices=('wsgi', 'asgi'), default='wsgi'
+        )
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument(
+            '--warmup', action='store_true',
+            help='Замерить и прогрев из notes.warmup.',
+        )
+
+    def handle(self, *args, **options):
+        runs = [
+            run_probe(options['target'], options['warmup'])
+            for _ in range(options['repeat'])
+        ]
+        self.stdout.write(
+            f'Холодный старт {options["target"]}, медиана по '
+            f'{len(runs)} запускам:'
+        )
+        for stage in runs[0][0]:
+            median = statistics.median(run[0][stage] for run in runs)
+            self.stdout.write(f'  {stage:<22}{median * 1000:8.1f} мс')
+        total = statistics.median(run[2] for run in runs)
+        self.stdout.write(
+            f'  {"процесс целиком":<22}{total * 1000:8.1f} мс'
+        )
+        modules = runs[-1][1]
+        self.report_packages(modules, options['top'])
+        self.report_modules(
+            'Модули по собственному времени импорта:',
+            sorted(modules, key=lambda module: -module[1]), options['top'],
+        )
+        self.report_modules(
+            'Модули по накопленному времени импорта:',
+            sorted(modules, key=lambda module: -module[2]), options['top'],
+        )
+
+    def report_packages(self, modules, top):
+        packages = defaultdict(lambda: [0, 0])
+        for name, own, _ in modules:
+            package = packages[name.split('.')[0]]
+            package[0] += own
+            package[1] += 1
+        self.stdout.write('Пакеты по собственному времени импорта:')
+        ranked = sorted(packages.items(), key=lambda item: -item[1][0])
+        for name, (own, count) in ranked[:top]:
+            self.stdout.write(
+                f'  {name:<40}{own / 1000:8.1f} мс ({count} модулей)'
+            )
+
+    def report_modules(self, title, modules, top):
+        self.stdout.write(title)
+        for name, own, cumulative in modules[:top]:
+            self.stdout.write(
+                f'  {name:<40}{own / 1000:8.1f} мс'
+                f'{cumulative / 1000:10.1f} мс накопл.'
+            )
@@ -0,0 +1,97 @@
+"""
+Короткоживущий кеш в памяти процесса с объединением одновременных промахов.
+
+Когда нужного значения в кеше нет, его вычисляет только первый запрос
+(лидер), а остальные запросы за тем же ключом ждут его результата. Так
+всплеск обращений к одной странице стоит одного запроса к БД и одного
+рендера, а не тысячи.
+
+Кеш у каждого процесса свой. Сброс по ключу действует в текущем процессе,
+в остальных значение устаревает не дольше чем через ttl секунд.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """Вычисление значения, которого ждут остальные запросы."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.stale = False
+
+
+class SingleFlightCache:
+    """Значения по ключу с временем жизни и вытеснением по LRU."""
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute, ttl, store_if=None):
+        """
+        Возвращает значение из кеша или результат compute().
+
+        Если store_if(значение) ложно, результат получают только ждущие
+        его запросы, в кеш он не попадает.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                return entry[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = compute()
+        except Exception as error:
+            flight.error = error
+            raise
+        else:
+            with self._lock:
+                # Если ключ сбросили во время вычисления, результат мог
+                # устареть: отдаём его ждущим, но не сохраняем.
+                if not flight.stale and (
+                    store_if is None or store_if(flight.value)
+                ):
+                    self._entries[key] = (
+                        time.monotonic() + ttl, flight.value
+                    )
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            flight = self._flights.pop(key, None)
+            if flight is not None:
+                flight.stale = True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for flight in self._flights.values():
+                flight.stale = True
+            self._flights.clear()
+
+
+public_notes = SingleFlightCache()
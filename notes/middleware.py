@@ -0,0 +1,84 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+# Имя файла с отпечатком ManifestStaticFilesStorage: bootstrap.1a2b3c4d5e6f.css
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+# Предпочтительные кодировки и расширения сжатых копий.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+ONE_YEAR = 60 * 60 * 24 * 365
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых через q=0."""
+    accepted = set()
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = item.partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """
+    Отдаёт собранную collectstatic статику из STATIC_ROOT.
+
+    Если клиент поддерживает сжатие, отдаётся заранее сжатая копия файла.
+    Файлы с отпечатком в имени кешируются клиентом на год, остальные -
+    на короткое время. Файлы, которых нет в STATIC_ROOT, обрабатываются
+    дальше по цепочке как обычно.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+
+    def __call__(self, request):
+        if (
+            settings.STATIC_ROOT
+            and request.method in ('GET', 'HEAD')
+            and request.path_info.startswith(self.prefix)
+        ):
+            name = request.path_info[len(self.prefix):]
+            response = self.serve(request, name)
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = staticfiles_storage.path(name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        content_type, _ = mimetypes.guess_type(path)
+        accepted = accepted_encodings(request)
+        encoding = None
+        for coding, extension in ENCODINGS:
+            if coding in accepted and os.path.isfile(path + extension):
+                encoding = coding
+                path += extension
+                break
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+            filename=os.path.basename(name),
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if HASHED_NAME.search(name):
+            patch_cache_control(
+                response, public=True, max_age=ONE_YEAR, immutable=True
+            )
+        else:
+            patch_cache_control(response, public=True, max_age=60)
+        return response
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteBody',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='SHA-256')),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='Ссылок')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='body',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='notes', to='notes.notebody'),
+        ),
+    ]
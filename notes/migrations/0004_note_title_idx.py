@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_notebody'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['title'], name='note_title_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_note_title_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Увеличивается при каждом редактировании заметки', verbose_name='Версия'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_note_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='is_public',
+            field=models.BooleanField(default=False, help_text='Заметку можно будет открыть по публичной ссылке без входа', verbose_name='Опубликована'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:38
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0006_note_is_public'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedText',
+            fields=[
+                ('note_id', models.PositiveBigIntegerField(primary_key=True, serialize=False, verbose_name='ID заметки')),
+                ('data', models.BinaryField(verbose_name='Текст, сжатый zlib')),
+                ('size', models.PositiveIntegerField(verbose_name='Размер текста, байт')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Перенесён в архив')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='archived',
+            field=models.BooleanField(default=False, editable=False, help_text='Текст заметки хранится в архивной БД', verbose_name='В архиве'),
+        ),
+        # Существующие заметки получают время миграции: более ранней даты
+        # изменения в схеме нет (см. ARCHIVE_AFTER_DAYS в настройках).
+        migrations.AddField(
+            model_name='note',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменена'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['archived', 'updated_at'], name='note_archived_updated_idx'),
+        ),
+    ]
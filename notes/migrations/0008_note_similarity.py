@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0007_note_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteSignature',
+            fields=[
+                ('note', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='notes.note')),
+                ('signature', models.BinaryField(verbose_name='Подпись MinHash')),
+                ('digest', models.CharField(help_text='Подпись пересчитывается, только если текст изменился', max_length=64, verbose_name='SHA-256 текста')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NoteBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True, verbose_name='Ключ корзины')),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='notes.note')),
+            ],
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_author(apps, schema_editor):
+    NoteBucket = apps.get_model('notes', 'NoteBucket')
+    Note = apps.get_model('notes', 'Note')
+    NoteBucket.objects.update(
+        author_id=models.Subquery(
+            Note.objects.filter(pk=models.OuterRef('note_id')).values(
+                'author_id'
+            )
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0008_note_similarity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notebucket',
+            name='author',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(fill_author, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='notebucket',
+            name='author',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='notebucket',
+            name='key',
+            field=models.BigIntegerField(verbose_name='Ключ корзины'),
+        ),
+        migrations.AddIndex(
+            model_name='notebucket',
+            index=models.Index(fields=['author', 'key'], name='notebucket_author_key_idx'),
+        ),
+    ]
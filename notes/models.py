@@ -1,7 +1,81 @@
+import hashlib
+import zlib
+
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from .fields import BodyTextField
+
+
+class NoteBody(models.Model):
+    """
+    Текст заметки, общий для всех заметок с одинаковым содержимым.
+
+    Ключ - SHA-256 текста, refcount - число заметок, которые на него
+    ссылаются. Когда ссылок не остаётся, запись удаляется.
+    """
+
+    digest = models.CharField('SHA-256', max_length=64, primary_key=True)
+    text = models.TextField('Текст')
+    refcount = models.PositiveIntegerField('Ссылок', default=0)
+
+    def __str__(self):
+        return self.digest
+
+    @staticmethod
+    def digest_for(text):
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @classmethod
+    def acquire(cls, digest, text):
+        """Добавляет ссылку на текст; запись создаётся, только если её нет."""
+        bodies = cls.objects.filter(pk=digest)
+        if bodies.update(refcount=models.F('refcount') + 1):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(digest=digest, text=text, refcount=1)
+        except IntegrityError:
+            # Ту же запись только что создал параллельный запрос.
+            bodies.update(refcount=models.F('refcount') + 1)
+
+    @classmethod
+    def release(cls, digest):
+        """Убирает ссылку на текст и удаляет его, если ссылок не осталось."""
+        bodies = cls.objects.filter(pk=digest)
+        if not bodies.filter(refcount__gt=1).update(
+            refcount=models.F('refcount') - 1
+        ):
+            bodies.delete()
+
+
+class ArchivedText(models.Model):
+    """
+    Сжатый текст заметки в архивной БД (см. notes.archive).
+
+    Хранится в отдельной БД, поэтому связан с заметкой не внешним ключом,
+    а просто её id.
+    """
+
+    note_id = models.PositiveBigIntegerField('ID заметки', primary_key=True)
+    data = models.BinaryField('Текст, сжатый zlib')
+    size = models.PositiveIntegerField('Размер текста, байт')
+    archived_at = models.DateTimeField(
+        'Перенесён в архив', default=timezone.now
+    )
 
-from pytils.translit import slugify
+    def __str__(self):
+        return str(self.note_id)
+
+    @classmethod
+    def pack(cls, note_id, text):
+        data = text.encode()
+        return cls(note_id=note_id, data=zlib.compress(data), size=len(data))
+
+    @property
+    def text(self):
+        return zlib.decompress(self.data).decode()
 
 
 class Note(models.Model):
@@ -11,7 +85,7 @@ class Note(models.Model):
         default='Название заметки',
         help_text='Дайте короткое название заметке'
     )
-    text = models.TextField(
+    text = BodyTextField(
         'Текст',
         help_text='Добавьте подробностей'
     )
@@ -27,12 +101,226 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    is_public = models.BooleanField(
+        'Опубликована',
+        default=False,
+        help_text='Заметку можно будет открыть по публичной ссылке без входа'
+    )
+    body = models.ForeignKey(
+        NoteBody,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='notes',
+    )
+    updated_at = models.DateTimeField('Изменена', auto_now=True)
+    archived = models.BooleanField(
+        'В архиве',
+        default=False,
+        editable=False,
+        help_text='Текст заметки хранится в архивной БД'
+    )
+    version = models.PositiveIntegerField(
+        'Версия',
+        default=1,
+        editable=False,
+        help_text='Увеличивается при каждом редактировании заметки'
+    )
+
+    class Meta:
+        indexes = (
+            # Префиксный поиск по заголовку в админке.
+            models.Index(fields=('title',), name='note_title_idx'),
+            # Поиск заметок для переноса в архив.
+            models.Index(
+                fields=('archived', 'updated_at'),
+                name='note_archived_updated_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
         if not self.slug:
+            # pytils нужен только здесь, не загружаем его при старте.
+            from pytils.translit import slugify
+
             max_slug_length = self._meta.get_field('slug').max_length
             self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        restored = self.archived
+        if restored:
+            # Правка архивной заметки возвращает её в основную таблицу.
+            self.text = self.text
+            self.archived = False
+            if update_fields is not None:
+                update_fields = kwargs['update_fields'] = {
+                    *update_fields, 'text', 'archived'
+                }
+        if update_fields is not None and 'text' not in update_fields:
+            super().save(*args, **kwargs)
+            return
+        try:
+            with transaction.atomic():
+                old_digest = self.body_id
+                new_digest = self.attach_body()
+                if update_fields is not None and new_digest != old_digest:
+                    kwargs['update_fields'] = {*update_fields, 'body'}
+                super().save(*args, **kwargs)
+                if old_digest and old_digest != new_digest:
+                    NoteBody.release(old_digest)
+                # Копию в архиве удаляем, только когда текст уже записан
+                # в основную таблицу: вне транзакции on_commit выполняет
+                # функцию сразу.
+                if restored:
+                    transaction.on_commit(self.drop_archived_text)
+        except Exception:
+            # В БД заметка осталась в архиве, экземпляр должен это видеть.
+            self.archived = restored
+            raise
+
+    def save_if_version(self, version, update_fields=None):
+        """
+        Сохраняет заметку, только если в БД она всё ещё версии version.
+
+        Проверка и увеличение версии - один UPDATE, поэтому из двух
+        параллельных правок одной версии пройдёт только одна. Возвращает
+        False, если заметку успели изменить.
+        """
+        with transaction.atomic():
+            if not Note.objects.filter(pk=self.pk, version=version).update(
+                version=version + 1
+            ):
+                return False
+            self.version = version + 1
+            if update_fields is not None:
+                update_fields = {*update_fields, 'updated_at'}
+            self.save(update_fields=update_fields)
+        return True
+
+    def archived_text(self):
+        """Текст из архивной БД; пустая строка, если его там нет."""
+        archived = ArchivedText.objects.filter(note_id=self.pk).first()
+        return archived.text if archived else ''
+
+    def drop_archived_text(self):
+        ArchivedText.objects.filter(note_id=self.pk).delete()
+
+    def attach_body(self):
+        """
+        Выбирает, где хранить текст, по настройке NOTES_DEDUPLICATE_BODIES.
+
+        При дедупликации текст кладётся в NoteBody, иначе - в строку
+        заметки. Возвращает digest новой записи NoteBody или None.
+        """
+        text = self.text
+        digest = None
+        if settings.NOTES_DEDUPLICATE_BODIES and text:
+            digest = NoteBody.digest_for(text)
+            if digest != self.body_id:
+                NoteBody.acquire(digest, text)
+        self.body_id = digest
+        # Текст уже прочитан из старой записи, держим его в памяти.
+        self.text = text
+        return digest
+
+
+class NoteSignature(models.Model):
+    """MinHash-подпись текста заметки (см. notes.similarity)."""
+
+    note = models.OneToOneField(
+        Note,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='signature',
+    )
+    signature = models.BinaryField('Подпись MinHash')
+    digest = models.CharField(
+        'SHA-256 текста',
+        max_length=64,
+        help_text='Подпись пересчитывается, только если текст изменился'
+    )
+
+    def __str__(self):
+        return str(self.note_id)
+
+
+class NoteBucket(models.Model):
+    """
+    Корзина LSH, в которую попала подпись заметки.
+
+    Автор заметки продублирован здесь, чтобы кандидаты искались по
+    индексу (автор, ключ) только среди заметок пользователя: общий для
+    многих пользователей шаблон не должен тянуть заметки всей таблицы.
+    """
+
+    note = models.ForeignKey(
+        Note, on_delete=models.CASCADE, related_name='buckets'
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+    )
+    key = models.BigIntegerField('Ключ корзины')
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'key'), name='notebucket_author_key_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.note_id}: {self.key}'
+
+
+class Task(models.Model):
+    """Фоновая задача из очереди notes.queue."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=200)
+    key = models.CharField(
+        'Ключ идемпотентности',
+        max_length=255,
+        help_text='В очереди может быть только одна задача с таким ключом'
+    )
+    payload = models.JSONField('Аргументы', default=dict)
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=5
+    )
+    run_after = models.DateTimeField('Выполнить после', default=timezone.now)
+    started_at = models.DateTimeField('Запущена', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('key',),
+                condition=models.Q(status='pending'),
+                name='unique_pending_task_key',
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'), name='task_status_run_after'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} [{self.key}]'
@@ -0,0 +1,38 @@
+"""
+Применение правок к тексту заметки.
+
+Правка - тройка [start, end, text]: заменить символы text[start:end]
+исходного текста строкой text. Позиции считаются в символах исходной
+версии, правки не должны пересекаться. Так клиент отправляет только
+изменённые куски, а не весь текст.
+"""
+
+
+def apply_ops(text, ops):
+    """Возвращает текст с применёнными правками, ValueError при ошибке."""
+    if not isinstance(ops, list):
+        raise ValueError('ops должен быть списком правок')
+    parts = []
+    position = 0
+    for op in sorted(_validate(op, len(text)) for op in ops):
+        start, end, insert = op
+        if start < position:
+            raise ValueError('Правки пересекаются')
+        parts.append(text[position:start])
+        parts.append(insert)
+        position = end
+    parts.append(text[position:])
+    return ''.join(parts)
+
+
+def _validate(op, length):
+    if not (isinstance(op, list) and len(op) == 3):
+        raise ValueError('Правка должна иметь вид [start, end, text]')
+    start, end, insert = op
+    if not (
+        type(start) is int and type(end) is int and isinstance(insert, str)
+    ):
+        raise ValueError('Правка должна иметь вид [start, end, text]')
+    if not 0 <= start <= end <= length:
+        raise ValueError('Правка выходит за границы текста')
+    return start, end, insert
@@ -1,18 +1,55 @@
 import pytest
 
+from django.contrib.auth import get_user_model
 from django.test.client import Client
 
+from notes.backends import clear_user_cache
 from notes.models import Note
 
+SEEDED_USERNAMES = ('Author', 'NotAuthor')
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    """
+    Заполняет тестовую БД общими данными один раз за сессию.
+
+    При запуске через pytest -n у каждого воркера xdist своя БД SQLite в
+    памяти, и заполняется она тоже один раз на воркер. Изменения внутри
+    теста откатываются транзакцией, так что каждый тест видит исходный
+    снимок данных без повторного создания.
+    """
+    with django_db_blocker.unblock():
+        get_user_model().objects.bulk_create(
+            get_user_model()(username=username)
+            for username in SEEDED_USERNAMES
+        )
+
+
+def seeded_user(username):
+    # Тест с django_db(transaction=True) после себя очищает все таблицы,
+    # в том числе общие данные сессии. Тогда пользователь создаётся
+    # заново, в транзакции теста.
+    return get_user_model().objects.get_or_create(username=username)[0]
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    # Откат транзакции не шлёт сигналов, поэтому кеш пользователей
+    # сбрасывается явно, чтобы изменения не протекали между тестами.
+    clear_user_cache()
+    yield
+    clear_user_cache()
+
 
 @pytest.fixture
 def author(django_user_model):
-    return django_user_model.objects.create(username='Author')
+    return seeded_user('Author')
 
 
 @pytest.fixture
 def not_author(django_user_model):
-    return django_user_model.objects.create(username='NotAuthor')
+    return seeded_user('NotAuthor')
 
 
 @pytest.fixture
@@ -0,0 +1,137 @@
+"""Тесты админки заметок: число запросов не зависит от числа записей."""
+from http import HTTPStatus
+
+import pytest
+
+from django.contrib.admin.models import DELETION, LogEntry
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+
+CHANGELIST_URL = reverse('admin:notes_note_changelist')
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    cache.clear()
+
+
+def create_notes(author, count, start=0):
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {i}', text='Текст', slug=f'n-{i}', author=author)
+        for i in range(start, start + count)
+    )
+
+
+def count_queries(client, url, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK
+    return len(queries), response
+
+
+@pytest.fixture
+def admin_client(admin_client):
+    # Прогрев кешей сессии и пользователя, чтобы считать только запросы
+    # самой страницы.
+    admin_client.get(reverse('admin:index'))
+    return admin_client
+
+
+def test_changelist_queries_do_not_grow(
+    admin_client, author, not_author, settings
+):
+    settings.ADMIN_COUNT_CACHE_TTL = 0
+    create_notes(author, 5)
+    small, _ = count_queries(admin_client, CHANGELIST_URL)
+    create_notes(not_author, 50, start=5)
+    large, _ = count_queries(admin_client, CHANGELIST_URL)
+    assert large == small
+
+
+def test_changelist_count_cached_and_text_deferred(admin_client, author):
+    create_notes(author, 5)
+    first, _ = count_queries(admin_client, CHANGELIST_URL)
+    second, response = count_queries(admin_client, CHANGELIST_URL)
+    assert second == first - 1
+    notes = list(response.context['cl'].result_list)
+    assert all('text' in note.get_deferred_fields() for note in notes)
+
+
+def test_unfiltered_count_from_planner_stats(admin_client, author):
+    create_notes(author, 12)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    create_notes(author, 3, start=12)
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(CHANGELIST_URL)
+    assert response.context['cl'].result_count == 12
+    assert not any('COUNT(' in query['sql'] for query in queries)
+    _, response = count_queries(admin_client, CHANGELIST_URL, q='заметка 1')
+    assert response.context['cl'].result_count == 6
+
+
+def test_search_by_slug_and_title_prefix(admin_client, author):
+    create_notes(author, 12)
+    _, response = count_queries(admin_client, CHANGELIST_URL, q='n-3')
+    assert [note.slug for note in response.context['cl'].result_list] == [
+        'n-3'
+    ]
+    _, response = count_queries(admin_client, CHANGELIST_URL, q='заметка 1')
+    assert sorted(
+        note.slug for note in response.context['cl'].result_list
+    ) == ['n-1', 'n-10', 'n-11']
+
+
+def test_change_page_does_not_list_users(admin_client, note, author):
+    url = reverse('admin:notes_note_change', args=(note.pk,))
+    admin_client.get(url)
+    small, response = count_queries(admin_client, url)
+    assert 'vForeignKeyRawIdAdminField' in response.content.decode()
+    assert 'user-0' not in response.content.decode()
+    for i in range(20):
+        type(author).objects.create(username=f'user-{i}')
+    large, _ = count_queries(admin_client, url)
+    assert large == small
+
+
+def test_delete_in_batches(admin_client, author, not_author, monkeypatch):
+    from notes.admin import NoteAdmin
+
+    monkeypatch.setattr(NoteAdmin, 'delete_batch_size', 3)
+    create_notes(author, 7)
+    create_notes(not_author, 2, start=7)
+    pks = list(
+        Note.objects.filter(author=author).values_list('pk', flat=True)
+    )
+    data = {'action': 'delete_in_batches', '_selected_action': pks}
+    response = admin_client.post(CHANGELIST_URL, data)
+    assert 'Удалить выбранные заметки: 7?' in response.content.decode()
+    assert Note.objects.count() == 9
+    response = admin_client.post(CHANGELIST_URL, {**data, 'post': 'yes'})
+    assert response.status_code == HTTPStatus.FOUND
+    assert list(Note.objects.values_list('author', flat=True)) == [
+        not_author.pk, not_author.pk
+    ]
+    logged = LogEntry.objects.filter(action_flag=DELETION)
+    assert sorted(map(int, logged.values_list('object_id', flat=True))) == (
+        sorted(pks)
+    )
+
+
+def test_delete_all_confirmation_does_not_list_notes(admin_client, author):
+    create_notes(author, 30)
+    data = {
+        'action': 'delete_in_batches',
+        'select_across': '1',
+        '_selected_action': [Note.objects.first().pk],
+    }
+    response = admin_client.post(CHANGELIST_URL, data)
+    content = response.content.decode()
+    assert 'Удалить выбранные заметки: 30?' in content
+    assert content.count('name="_selected_action"') == 1
+    admin_client.post(CHANGELIST_URL, {**data, 'post': 'yes'})
+    assert not Note.objects.exists()
@@ -0,0 +1,148 @@
+"""Тесты архивации давно не изменявшихся заметок."""
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from notes.archive import archive_notes
+from notes.models import ArchivedText, Note, NoteBody
+
+pytestmark = pytest.mark.django_db(databases=('default', 'archive'))
+
+LONG_TEXT = 'Давно забытая заметка. ' * 100
+
+
+@pytest.fixture
+def old_note(author):
+    note = Note.objects.create(
+        title='Старая', text=LONG_TEXT, slug='old', author=author
+    )
+    Note.objects.filter(pk=note.pk).update(
+        updated_at=timezone.now() - timedelta(days=400)
+    )
+    return note
+
+
+def test_only_old_notes_archived(old_note, note):
+    assert archive_notes(days=365, batch_size=1) == 1
+    old_note.refresh_from_db()
+    assert old_note.archived
+    assert Note.objects.filter(pk=old_note.pk, text='').exists()
+    archived = ArchivedText.objects.get(note_id=old_note.pk)
+    assert archived.text == LONG_TEXT
+    assert len(archived.data) < archived.size
+    note.refresh_from_db()
+    assert not note.archived
+    assert archive_notes(days=365) == 0
+
+
+def test_owner_reads_archived_note(author_client, old_note):
+    archive_notes(days=365)
+    response = author_client.get(reverse('notes:detail', args=('old',)))
+    assert LONG_TEXT in response.content.decode()
+
+
+def test_edit_restores_note(
+    author_client, old_note, form_data, django_capture_on_commit_callbacks
+):
+    archive_notes(days=365)
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.post(
+            reverse('notes:edit', args=('old',)), form_data
+        )
+    old_note.refresh_from_db()
+    assert not old_note.archived
+    assert Note.objects.filter(
+        pk=old_note.pk, text=form_data['text']
+    ).exists()
+    assert not ArchivedText.objects.exists()
+
+
+def test_title_patch_restores_text(
+    author_client, old_note, django_capture_on_commit_callbacks
+):
+    archive_notes(days=365)
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.patch(
+            reverse('notes:patch', args=('old',)),
+            {'version': 1, 'title': 'Снова нужна'},
+            content_type='application/json',
+        )
+    assert Note.objects.filter(
+        pk=old_note.pk, archived=False, text=LONG_TEXT, title='Снова нужна'
+    ).exists()
+    assert not ArchivedText.objects.exists()
+
+
+def test_shared_body_released(old_note, settings):
+    settings.NOTES_DEDUPLICATE_BODIES = True
+    old_note.save(update_fields=('text',))
+    Note.objects.filter(pk=old_note.pk).update(
+        updated_at=timezone.now() - timedelta(days=400)
+    )
+    assert archive_notes(days=365) == 1
+    assert not NoteBody.objects.exists()
+    assert Note.objects.get(pk=old_note.pk).text == LONG_TEXT
+
+
+def test_delete_drops_archived_text(
+    old_note, django_capture_on_commit_callbacks
+):
+    archive_notes(days=365)
+    with django_capture_on_commit_callbacks(execute=True):
+        Note.objects.get(pk=old_note.pk).delete()
+    assert not ArchivedText.objects.exists()
+
+
+def test_command_reports_size(old_note):
+    out = StringIO()
+    call_command('archive_notes', stdout=out)
+    output = out.getvalue()
+    assert 'Перенесено в архив заметок: 1' in output
+    assert 'Архив: 1 заметок' in output
+
+
+@pytest.mark.django_db(transaction=True, databases=('default', 'archive'))
+def test_failed_save_keeps_archived_text(author):
+    # Без транзакции теста: on_commit здесь выполняется сразу, как в
+    # обычном запросе без ATOMIC_REQUESTS.
+    Note.objects.create(title='Занято', text='-', slug='taken', author=author)
+    note = Note.objects.create(
+        title='Старая', text=LONG_TEXT, slug='old', author=author
+    )
+    Note.objects.filter(pk=note.pk).update(
+        updated_at=timezone.now() - timedelta(days=400)
+    )
+    archive_notes(days=365)
+    note = Note.objects.get(pk=note.pk)
+    note.slug = 'taken'
+    with pytest.raises(IntegrityError):
+        note.save()
+    assert note.archived
+    assert ArchivedText.objects.get(note_id=note.pk).text == LONG_TEXT
+    note.slug = 'old'
+    note.save()
+    assert Note.objects.filter(
+        pk=note.pk, archived=False, text=LONG_TEXT
+    ).exists()
+    assert not ArchivedText.objects.exists()
+
+
+def test_changed_note_leaves_no_archive_copy(old_note, monkeypatch):
+    pack = ArchivedText.pack
+
+    def pack_and_edit(note_id, text):
+        # Правка заметки, пока её текст пишется в архив.
+        Note.objects.filter(pk=note_id).update(version=F('version') + 1)
+        return pack(note_id, text)
+
+    monkeypatch.setattr(ArchivedText, 'pack', pack_and_edit)
+    assert archive_notes(days=365) == 0
+    assert Note.objects.filter(pk=old_note.pk, text=LONG_TEXT).exists()
+    assert not ArchivedText.objects.exists()
@@ -0,0 +1,93 @@
+"""Количество запросов к БД у страниц для авторизованного пользователя."""
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+
+from django.conf import settings
+from django.test.client import Client
+from django.urls import reverse
+
+# Запрос сессии + запрос пользователя + запрос заметок.
+QUERIES_WITHOUT_CACHE = 3
+# Сессия и пользователь берутся из кеша, остаётся запрос заметок.
+QUERIES_WITH_CACHE = 1
+
+
+def test_cached_session_and_user_save_queries(
+    author, settings, django_assert_num_queries
+):
+    # В тестах один процесс, поэтому подходит и кеш в памяти.
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    author_client = Client()
+    author_client.force_login(author)
+    url = reverse('notes:list')
+    # Первый запрос прогревает кеш пользователя.
+    author_client.get(url)
+    with django_assert_num_queries(QUERIES_WITH_CACHE):
+        author_client.get(url)
+
+
+def test_db_sessions_query_count(
+    author, settings, django_assert_num_queries
+):
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+    settings.AUTHENTICATION_BACKENDS = [
+        'django.contrib.auth.backends.ModelBackend'
+    ]
+    client = Client()
+    client.force_login(author)
+    url = reverse('notes:list')
+    client.get(url)
+    with django_assert_num_queries(QUERIES_WITHOUT_CACHE):
+        client.get(url)
+
+
+def test_signed_cookie_sessions_skip_session_table(
+    author, settings, django_assert_num_queries
+):
+    settings.SESSION_ENGINE = (
+        'django.contrib.sessions.backends.signed_cookies'
+    )
+    client = Client()
+    client.force_login(author)
+    url = reverse('notes:list')
+    client.get(url)
+    with django_assert_num_queries(QUERIES_WITH_CACHE):
+        client.get(url)
+
+
+def test_cached_db_sessions_need_shared_cache():
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'yanote.settings',
+        'YANOTE_SESSION_PROFILE': 'cached_db',
+    }
+    load = [sys.executable, '-c', 'import django; django.setup()']
+    result = subprocess.run(
+        load, capture_output=True, text=True, cwd=settings.BASE_DIR,
+        env={**env, 'YANOTE_CACHE_PROFILE': 'locmem'},
+    )
+    assert 'ImproperlyConfigured' in result.stderr
+    subprocess.run(
+        load, check=True, cwd=settings.BASE_DIR,
+        env={**env, 'YANOTE_CACHE_PROFILE': 'file'},
+    )
+
+
+def test_user_change_invalidates_cache(author, author_client):
+    url = reverse('notes:list')
+    author_client.get(url)
+    author.username = 'Renamed'
+    author.save()
+    response = author_client.get(url)
+    assert response.context['user'].username == 'Renamed'
+
+
+def test_deleted_user_is_logged_out(author, author_client):
+    url = reverse('notes:list')
+    author_client.get(url)
+    author.delete()
+    response = author_client.get(url)
+    # Удалённый пользователь становится анонимом и уходит на логин.
+    assert response.status_code == HTTPStatus.FOUND
@@ -0,0 +1,84 @@
+"""Тесты подсказок заголовков заметок."""
+import pytest
+
+from django.urls import reverse
+
+from notes.autocomplete import PrefixIndex, titles
+from notes.models import Note
+
+
+@pytest.fixture(autouse=True)
+def empty_indexes():
+    titles.clear()
+    yield
+    titles.clear()
+
+
+def search(client, query):
+    response = client.get(reverse('notes:autocomplete'), {'q': query})
+    return [note['title'] for note in response.json()['results']]
+
+
+def test_index_matches_any_word_and_transliteration():
+    index = PrefixIndex([
+        (1, 'Список покупок', 'spisok'),
+        (2, 'План отпуска', 'plan'),
+    ])
+    assert index.search('спи') == [('Список покупок', 'spisok')]
+    assert index.search('ПОКУ') == [('Список покупок', 'spisok')]
+    assert index.search('otp') == [('План отпуска', 'plan')]
+    assert index.search('нет') == []
+    assert index.search(' ') == []
+
+
+def test_index_add_and_remove():
+    index = PrefixIndex([(1, 'Старое', 'note')])
+    index.add(1, 'Новое', 'note')
+    assert index.search('стар') == []
+    assert index.search('нов') == [('Новое', 'note')]
+    index.remove(1)
+    assert index.search('нов') == []
+    assert len(index) == 0
+
+
+def test_endpoint_returns_only_own_notes(author_client, note, not_author):
+    Note.objects.create(
+        title='Заголовок чужой', text='Текст', slug='other', author=not_author
+    )
+    response = author_client.get(
+        reverse('notes:autocomplete'), {'q': 'заг'}
+    )
+    assert response.json() == {'results': [{
+        'title': note.title,
+        'url': reverse('notes:detail', args=(note.slug,)),
+    }]}
+
+
+def test_lookups_after_first_do_not_query_db(
+    author_client, note, django_assert_num_queries
+):
+    search(author_client, 'заг')
+    # Пользователь в кеше, индекс в памяти: остаётся только чтение
+    # сессии (по умолчанию сессии в БД).
+    with django_assert_num_queries(1):
+        assert search(author_client, 'zag') == [note.title]
+
+
+def test_index_follows_note_changes(
+    author, author_client, note, django_capture_on_commit_callbacks
+):
+    assert search(author_client, 'заг') == [note.title]
+    with django_capture_on_commit_callbacks(execute=True):
+        note.title = 'Переименовано'
+        note.save()
+        Note.objects.create(title='Заглушка', text='Т', author=author)
+    assert search(author_client, 'заг') == ['Заглушка']
+    with django_capture_on_commit_callbacks(execute=True):
+        note.delete()
+    assert search(author_client, 'пере') == []
+
+
+def test_anonymous_redirected(client):
+    url = reverse('notes:autocomplete')
+    response = client.get(url)
+    assert response.url.startswith(reverse('users:login'))
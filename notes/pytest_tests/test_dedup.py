@@ -0,0 +1,71 @@
+"""Тесты хранения одинаковых текстов заметок в общей таблице."""
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note, NoteBody
+
+TEXT = 'Шаблон заметки, скопированный много раз.'
+
+
+@pytest.fixture
+def dedup(settings):
+    settings.NOTES_DEDUPLICATE_BODIES = True
+
+
+def create_note(author, slug, text=TEXT):
+    return Note.objects.create(title=slug, text=text, slug=slug, author=author)
+
+
+@pytest.mark.usefixtures('dedup')
+def test_identical_texts_stored_once(author, not_author):
+    first = create_note(author, 'first')
+    with CaptureQueriesContext(connection) as queries:
+        create_note(not_author, 'second')
+    body = NoteBody.objects.get()
+    assert body.refcount == 2
+    assert body.text == TEXT
+    # Второй раз текст не вставляется, только увеличивается счётчик.
+    assert not any(
+        'INSERT INTO "notes_notebody"' in query['sql']
+        for query in queries.captured_queries
+    )
+    # В строках заметок текст не хранится, но читается прозрачно.
+    assert set(Note.objects.values_list('text', flat=True)) == {''}
+    assert Note.objects.get(pk=first.pk).text == TEXT
+
+
+@pytest.mark.usefixtures('dedup')
+def test_edit_and_delete_release_bodies(author):
+    first = create_note(author, 'first')
+    second = create_note(author, 'second')
+    first.text = 'Другой текст'
+    first.save()
+    assert NoteBody.objects.get(pk=NoteBody.digest_for(TEXT)).refcount == 1
+    second.delete()
+    assert not NoteBody.objects.filter(pk=NoteBody.digest_for(TEXT)).exists()
+    author.delete()
+    assert not NoteBody.objects.exists()
+
+
+@pytest.mark.usefixtures('dedup')
+def test_edit_page_shows_shared_text(author, author_client):
+    note = create_note(author, 'first')
+    response = author_client.get(reverse('notes:edit', args=(note.slug,)))
+    assert response.context['form'].initial['text'] == TEXT
+
+
+def test_command_moves_bodies_both_ways(author, settings, capsys):
+    for slug in ('a', 'b', 'c'):
+        create_note(author, slug)
+    settings.NOTES_DEDUPLICATE_BODIES = True
+    call_command('dedup_bodies', batch_size=2)
+    assert NoteBody.objects.get().refcount == 3
+    assert 'Экономия: 80 символов, 66.7%' in capsys.readouterr().out
+    settings.NOTES_DEDUPLICATE_BODIES = False
+    call_command('dedup_bodies')
+    assert not NoteBody.objects.exists()
+    assert set(Note.objects.values_list('text', flat=True)) == {TEXT}
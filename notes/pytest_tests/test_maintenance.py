@@ -0,0 +1,128 @@
+"""Тесты обслуживания БД."""
+import sqlite3
+from io import StringIO
+
+import pytest
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from notes import maintenance
+from notes.models import Note, Task
+from notes.tasks import optimize_database
+from notes.views import PublicNote
+
+
+@pytest.fixture
+def fragmented(tmp_path):
+    """Файл БД с auto_vacuum = INCREMENTAL и удалёнными данными."""
+    database = sqlite3.connect(tmp_path / 'db.sqlite3', isolation_level=None)
+    cursor = database.cursor()
+    cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    cursor.execute('CREATE TABLE notes (text TEXT)')
+    cursor.executemany(
+        'INSERT INTO notes VALUES (?)', [('x' * 2000,)] * 1000
+    )
+    cursor.execute('DELETE FROM notes')
+    yield cursor
+    database.close()
+
+
+def drop_author_index():
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, Note._meta.db_table
+        )
+        for name, constraint in constraints.items():
+            if constraint['index'] and constraint['columns'] == [
+                'author_id'
+            ]:
+                cursor.execute(f'DROP INDEX "{name}"')
+
+
+def test_incremental_vacuum_reclaims_pages(fragmented):
+    before = maintenance.file_stats(fragmented)
+    assert before['free'] > 400
+    reclaimed, steps = maintenance.incremental_vacuum(
+        fragmented, step_pages=100, pause=0
+    )
+    after = maintenance.file_stats(fragmented)
+    assert reclaimed == before['free']
+    assert steps == -(-before['free'] // 100)
+    assert after['free'] == 0
+    assert after['pages'] == before['pages'] - reclaimed
+
+
+def test_incremental_vacuum_respects_budget(fragmented):
+    assert maintenance.incremental_vacuum(fragmented, max_seconds=0) == (
+        0, 0
+    )
+
+
+def test_vacuum_skipped_without_incremental_mode(tmp_path):
+    cursor = sqlite3.connect(tmp_path / 'db.sqlite3').cursor()
+    cursor.execute('CREATE TABLE notes (text TEXT)')
+    assert maintenance.incremental_vacuum(cursor) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_view_plans_use_indexes():
+    plans = {name: plan for name, plan, _ in maintenance.check_plans()}
+    assert {'notes:detail', 'notes:list', 'notes:public'} <= plans.keys()
+    assert not any(
+        regression for _, _, regression in maintenance.check_plans()
+    )
+    assert 'slug=?' in plans['notes:detail'][0]
+    assert 'author_id=?' in plans['notes:list'][0]
+    assert maintenance.missing_note_indexes(connection) == []
+
+
+@pytest.mark.django_db
+def test_plans_follow_view_queries(monkeypatch):
+    monkeypatch.setattr(
+        PublicNote, 'get_queryset',
+        lambda view: Note.objects.filter(text=view.kwargs['note_slug']),
+    )
+    regressions = [
+        name for name, _, regression in maintenance.check_plans()
+        if regression
+    ]
+    assert regressions == ['notes:public']
+
+
+@pytest.mark.django_db
+def test_missing_index_reported():
+    drop_author_index()
+    regressions = [
+        name for name, _, regression in maintenance.check_plans()
+        if regression
+    ]
+    assert 'notes:list' in regressions
+    assert maintenance.missing_note_indexes(connection) == [('author_id',)]
+    with pytest.raises(CommandError):
+        call_command(
+            'db_maintenance', databases=['default'], check=True,
+            stdout=StringIO(),
+        )
+
+
+@pytest.mark.django_db
+def test_command_report():
+    out = StringIO()
+    call_command(
+        'db_maintenance', databases=['default'], check=True, schedule=True,
+        stdout=out,
+    )
+    output = out.getvalue()
+    assert 'default:' in output
+    assert 'ok        notes:detail' in output
+    assert Task.objects.filter(key=optimize_database.task_name).exists()
+
+
+@pytest.mark.django_db(databases=('default', 'archive'))
+def test_optimize_task_reschedules_itself():
+    optimize_database()
+    optimize_database()
+    assert Task.objects.filter(
+        key=optimize_database.task_name, status=Task.PENDING
+    ).count() == 1
@@ -0,0 +1,123 @@
+"""Тесты частичного обновления заметок с проверкой версии."""
+import json
+from http import HTTPStatus
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.forms import CONFLICT
+from notes.models import Note
+from notes.patches import apply_ops
+
+
+def patch(client, note, data):
+    return client.patch(
+        reverse('notes:patch', args=(note.slug,)),
+        json.dumps(data),
+        content_type='application/json',
+    )
+
+
+@pytest.mark.parametrize(
+    'ops, expected',
+    (
+        ([], 'Текст заметки'),
+        ([[0, 5, 'Содержимое']], 'Содержимое заметки'),
+        ([[13, 13, '!'], [0, 0, '> ']], '> Текст заметки!'),
+        ([[5, 13, '']], 'Текст'),
+    ),
+)
+def test_apply_ops(ops, expected):
+    assert apply_ops('Текст заметки', ops) == expected
+
+
+@pytest.mark.parametrize(
+    'ops',
+    (
+        [[0, 20, 'x']],
+        [[3, 1, 'x']],
+        [[0, 3, 'x'], [2, 4, 'y']],
+        [[0, 1]],
+        [['0', 1, 'x']],
+        'x',
+    ),
+)
+def test_apply_ops_rejects_invalid(ops):
+    with pytest.raises(ValueError):
+        apply_ops('Текст заметки', ops)
+
+
+def test_patch_writes_only_changed_fields(author_client, note):
+    with CaptureQueriesContext(connection) as queries:
+        response = patch(author_client, note, {
+            'version': 1, 'ops': [[0, 5, 'Содержимое']],
+        })
+    assert response.json() == {'version': 2}
+    updates = [
+        query['sql'] for query in queries
+        if query['sql'].startswith('UPDATE "notes_note"')
+    ]
+    assert len(updates) == 2
+    assert '"title"' not in updates[1]
+    note.refresh_from_db()
+    assert (note.text, note.title, note.version) == (
+        'Содержимое заметки', 'Заголовок', 2
+    )
+
+
+def test_stale_version_rejected(author_client, note):
+    patch(author_client, note, {'version': 1, 'title': 'Первая вкладка'})
+    response = patch(author_client, note, {
+        'version': 1, 'ops': [[0, 0, 'Вторая вкладка ']],
+    })
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json()['version'] == 2
+    note.refresh_from_db()
+    assert (note.title, note.text) == ('Первая вкладка', 'Текст заметки')
+
+
+def test_concurrent_save_loses_race(note):
+    first = Note.objects.get(pk=note.pk)
+    second = Note.objects.get(pk=note.pk)
+    first.text = 'Первая правка'
+    second.text = 'Вторая правка'
+    assert first.save_if_version(1) is True
+    assert second.save_if_version(1) is False
+    note.refresh_from_db()
+    assert (note.text, note.version) == ('Первая правка', 2)
+
+
+@pytest.mark.parametrize(
+    'data',
+    (
+        {'ops': []},
+        {'version': '1'},
+        {'version': 1, 'ops': [[0, 99, 'x']]},
+        {'version': 1, 'title': 'x' * 101},
+        {'version': 1, 'ops': [[0, 13, '']]},
+    ),
+)
+def test_invalid_patch(author_client, note, data):
+    response = patch(author_client, note, data)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    note.refresh_from_db()
+    assert note.version == 1
+
+
+def test_other_user_cannot_patch(not_author_client, note):
+    response = patch(not_author_client, note, {'version': 1, 'title': 'x'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_edit_form_rejects_stale_version(author_client, note, form_data):
+    url = reverse('notes:edit', args=(note.slug,))
+    patch(author_client, note, {'version': 1, 'title': 'Из другой вкладки'})
+    response = author_client.post(url, {**form_data, 'version': 1})
+    assert CONFLICT in response.context['form'].non_field_errors()
+    response = author_client.post(url, {**form_data, 'version': 2})
+    assert response.status_code == HTTPStatus.FOUND
+    note.refresh_from_db()
+    assert (note.title, note.version) == (form_data['title'], 3)
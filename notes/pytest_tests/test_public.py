@@ -0,0 +1,146 @@
+"""Тесты публичных ссылок на заметки и микрокеша."""
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+
+from django.urls import reverse
+
+from notes.microcache import SingleFlightCache, public_notes
+
+
+@pytest.fixture(autouse=True)
+def empty_microcache():
+    public_notes.clear()
+    yield
+    public_notes.clear()
+
+
+@pytest.fixture
+def public_note(note):
+    note.is_public = True
+    note.save()
+    return note
+
+
+@pytest.fixture
+def public_url(public_note):
+    return reverse('notes:public', args=(public_note.slug,))
+
+
+def test_concurrent_misses_compute_once():
+    cache = SingleFlightCache()
+    calls = []
+    start = threading.Barrier(20)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'страница'
+
+    def request(results):
+        start.wait()
+        results.append(cache.get_or_compute('key', compute, ttl=60))
+
+    results = []
+    threads = [
+        threading.Thread(target=request, args=(results,)) for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == ['страница'] * 20
+
+
+def test_error_is_shared_and_not_cached():
+    cache = SingleFlightCache()
+
+    def fail():
+        raise RuntimeError('БД недоступна')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('key', fail, ttl=60)
+    assert cache.get_or_compute('key', lambda: 'ok', ttl=60) == 'ok'
+
+
+def test_invalidate_during_compute_discards_result():
+    cache = SingleFlightCache()
+
+    def compute():
+        cache.invalidate('key')
+        return 'старая версия'
+
+    assert cache.get_or_compute('key', compute, ttl=60) == 'старая версия'
+    assert cache.get_or_compute('key', lambda: 'новая', ttl=60) == 'новая'
+
+
+def test_ttl_and_lru_eviction():
+    cache = SingleFlightCache(max_size=2)
+    assert cache.get_or_compute('a', lambda: 1, ttl=0) == 1
+    assert cache.get_or_compute('a', lambda: 2, ttl=60) == 2
+    cache.get_or_compute('b', lambda: 3, ttl=60)
+    cache.get_or_compute('c', lambda: 4, ttl=60)
+    assert cache.get_or_compute('a', lambda: 5, ttl=60) == 5
+
+
+def test_unstored_value_shared_but_not_cached():
+    cache = SingleFlightCache()
+    assert cache.get_or_compute(
+        'key', lambda: None, ttl=60, store_if=bool
+    ) is None
+    assert cache.get_or_compute('key', lambda: 'ok', ttl=60) == 'ok'
+
+
+def test_missing_slugs_do_not_evict_pages(
+    client, public_url, django_assert_num_queries
+):
+    client.get(public_url)
+    for number in range(1100):
+        slug = f'missing-{number}'
+        response = client.get(reverse('notes:public', args=(slug,)))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+    with django_assert_num_queries(0):
+        assert client.get(public_url).status_code == HTTPStatus.OK
+
+
+def test_public_note_available_anonymously(client, public_note, public_url):
+    response = client.get(public_url)
+    assert response.status_code == HTTPStatus.OK
+    assert public_note.text in response.content.decode()
+    assert response['Cache-Control'] == 'public, max-age=5'
+
+
+def test_private_note_not_published(client, note):
+    response = client.get(reverse('notes:public', args=(note.slug,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_burst_makes_one_query(
+    client, public_url, django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        for _ in range(50):
+            assert client.get(public_url).status_code == HTTPStatus.OK
+
+
+def test_page_has_no_personal_data(author_client, author, public_url):
+    content = author_client.get(public_url).content.decode()
+    assert author.username not in content
+    assert 'csrfmiddlewaretoken' not in content
+
+
+def test_save_and_delete_invalidate(
+    client, public_note, public_url, django_capture_on_commit_callbacks
+):
+    client.get(public_url)
+    with django_capture_on_commit_callbacks(execute=True):
+        public_note.text = 'Обновлённый текст'
+        public_note.save()
+    assert 'Обновлённый текст' in client.get(public_url).content.decode()
+    with django_capture_on_commit_callbacks(execute=True):
+        public_note.is_public = False
+        public_note.save()
+    assert client.get(public_url).status_code == HTTPStatus.NOT_FOUND
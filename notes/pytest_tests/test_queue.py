@@ -0,0 +1,158 @@
+"""Тесты очереди фоновых задач."""
+from datetime import timedelta
+
+import pytest
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.utils import timezone
+
+from notes import queue
+from notes.models import Note, Task
+
+pytestmark = pytest.mark.django_db
+
+calls = []
+
+
+@queue.task
+def remember(value):
+    calls.append(value)
+
+
+@queue.task
+def always_fails():
+    raise RuntimeError('Сбой')
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+def test_task_runs_and_leaves_queue():
+    queue.enqueue(remember, {'value': 1})
+    assert queue.run_pending() == [True]
+    assert calls == [1]
+    assert not Task.objects.exists()
+
+
+def test_same_key_coalesces_into_one_task():
+    for value in range(5):
+        queue.enqueue(remember, {'value': value}, key='note:1')
+    assert Task.objects.count() == 1
+    queue.run_pending()
+    # Выполняется одна задача с последними аргументами.
+    assert calls == [4]
+
+
+def test_new_task_with_key_of_running_one_is_queued():
+    queue.enqueue(remember, {'value': 1}, key='note:1')
+    queue.claim(1)
+    queue.enqueue(remember, {'value': 2}, key='note:1')
+    assert Task.objects.filter(status=Task.PENDING).count() == 1
+    assert Task.objects.filter(status=Task.RUNNING).count() == 1
+
+
+def test_task_claimed_during_enqueue_is_requeued():
+    queue.enqueue(remember, {'value': 1}, key='note:1')
+    failed, claimed = [], []
+
+    def claim_after_failed_insert(execute, sql, params, many, context):
+        # Воркер забирает ожидающую задачу сразу после неудачной вставки.
+        if failed == ['insert'] and sql.startswith('SELECT'):
+            failed.append('claim')
+            claimed.extend(queue.claim(1))
+        try:
+            return execute(sql, params, many, context)
+        except IntegrityError:
+            failed.append('insert')
+            raise
+
+    with connection.execute_wrapper(claim_after_failed_insert):
+        pk = queue.enqueue(remember, {'value': 2}, key='note:1')
+    assert claimed and pk not in claimed
+    assert Task.objects.get(pk=pk).payload == {'value': 2}
+    assert Task.objects.get(pk=pk).status == Task.PENDING
+
+
+def test_unregistered_task_is_rejected():
+    with pytest.raises(KeyError):
+        queue.enqueue('notes.unknown')
+
+
+def test_failed_task_retried_with_backoff(settings):
+    settings.TASK_QUEUE_RETRY_DELAY = 10
+    queue.enqueue(always_fails, max_attempts=2)
+    assert queue.run_pending() == [False]
+    task = Task.objects.get()
+    assert task.status == Task.PENDING
+    assert 'Сбой' in task.last_error
+    assert task.run_after > timezone.now() + timedelta(seconds=5)
+    # Пока не наступил срок повтора, задача не берётся.
+    assert queue.run_pending() == []
+    Task.objects.update(run_after=timezone.now())
+    queue.run_pending()
+    task.refresh_from_db()
+    assert task.status == Task.FAILED
+    assert task.attempts == 2
+
+
+def test_stale_running_task_requeued():
+    queue.enqueue(remember, {'value': 1})
+    queue.claim(1)
+    Task.objects.update(started_at=timezone.now() - timedelta(hours=1))
+    assert queue.requeue_stale(timeout=60) == 1
+    assert Task.objects.get().status == Task.PENDING
+
+
+def test_stats_report_depth_and_lag():
+    queue.enqueue(remember, {'value': 1})
+    Task.objects.update(run_after=timezone.now() - timedelta(seconds=30))
+    queue.enqueue(always_fails, delay=60)
+    stats = queue.queue_stats()
+    assert stats['depth'] == 2
+    assert stats['lag'] >= 30
+
+
+def test_note_edits_coalesce_into_one_task(
+    author, monkeypatch, django_capture_on_commit_callbacks
+):
+    monkeypatch.setattr(queue, '_note_tasks', [])
+    monkeypatch.setattr(queue, '_registry', dict(queue._registry))
+    handled = []
+
+    @queue.note_task
+    def index_note(note_id):
+        handled.append(note_id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        note = Note.objects.create(title='З', text='Т', author=author)
+        for text in ('1', '2', '3'):
+            note.text = text
+            note.save()
+    assert Task.objects.count() == 1
+    Task.objects.update(run_after=timezone.now())
+    queue.run_pending()
+    assert handled == [note.pk]
+
+
+def test_run_workers_stats(capsys):
+    queue.enqueue(remember, {'value': 1})
+    call_command('run_workers', stats=True)
+    assert '1 ждут' in capsys.readouterr().out
+
+
+def test_worker_survives_error_outside_task(monkeypatch, caplog):
+    def vanished(pk):
+        raise Task.DoesNotExist
+
+    monkeypatch.setattr(queue, 'run_task', vanished)
+    queue.enqueue(remember, {'value': 1})
+    queue.enqueue(remember, {'value': 2})
+    call_command('run_workers', once=True, workers=1, poll_interval=0)
+    failures = [
+        record for record in caplog.records
+        if record.getMessage().startswith('Сбой воркера на задаче')
+    ]
+    assert len(failures) == 2
@@ -0,0 +1,106 @@
+"""Тесты ограничения частоты входа и настраиваемого хеширования паролей."""
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.urls import reverse
+
+from notes.ratelimit import TokenBucketLimiter, reset_limiters
+
+PASSWORD = 'Secret-password-1'
+
+
+@pytest.fixture(autouse=True)
+def fast_hashing(settings):
+    settings.PASSWORD_HASHER_PARAMS = {
+        **settings.PASSWORD_HASHER_PARAMS, 'PBKDF2_ITERATIONS': 1000
+    }
+    settings.RATE_LIMITS = {
+        'ip': {'RATE': 1, 'BURST': 3},
+        'username': {'RATE': 0.1, 'BURST': 2},
+    }
+    reset_limiters()
+    yield
+    reset_limiters()
+
+
+@pytest.fixture
+def user_with_password(django_user_model):
+    return django_user_model.objects.create_user(
+        username='Login', password=PASSWORD
+    )
+
+
+def test_bucket_refills_over_time():
+    limiter = TokenBucketLimiter(rate=1, burst=2)
+    assert limiter.consume('key', now=0) == 0
+    assert limiter.consume('key', now=0) == 0
+    assert limiter.consume('key', now=0) == pytest.approx(1)
+    assert limiter.consume('key', now=1) == 0
+
+
+def test_bucket_evicts_oldest_keys():
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=2)
+    for key in ('a', 'b', 'c'):
+        limiter.consume(key, now=0)
+    # Ключ 'a' вытеснен, поэтому у него снова полная корзина.
+    assert limiter.consume('a', now=0) == 0
+    assert limiter.consume('c', now=0) > 0
+
+
+@pytest.mark.django_db
+def test_username_limit_rejects_before_hashing(client, user_with_password):
+    url = reverse('users:login')
+    data = {'username': 'Login', 'password': 'wrong'}
+    for i in range(2):
+        client.post(url, data, REMOTE_ADDR=f'10.0.0.{i}')
+    with mock.patch('django.contrib.auth.forms.authenticate') as auth:
+        response = client.post(url, data, REMOTE_ADDR='10.0.0.9')
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response['Retry-After']) > 0
+    auth.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_ip_limit_applies_to_signup(client):
+    url = reverse('users:signup')
+    statuses = [
+        client.post(url, {'username': f'user{i}'}).status_code
+        for i in range(4)
+    ]
+    assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS
+    assert HTTPStatus.TOO_MANY_REQUESTS not in statuses[:-1]
+
+
+def test_hash_upgraded_on_login(client, settings, user_with_password):
+    settings.PASSWORD_HASHER_PARAMS = {
+        **settings.PASSWORD_HASHER_PARAMS, 'PBKDF2_ITERATIONS': 2000
+    }
+    response = client.post(
+        reverse('users:login'),
+        {'username': 'Login', 'password': PASSWORD},
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    user_with_password.refresh_from_db()
+    assert user_with_password.password.startswith('pbkdf2_sha256$2000$')
+
+
+@pytest.mark.parametrize('profile, prefix', (
+    ('scrypt', 'scrypt$'),
+    ('argon2', 'argon2$argon2id$v=19$m=1024,t=1,p=1$'),
+))
+def test_hasher_profiles(settings, profile, prefix):
+    settings.PASSWORD_HASHERS = [settings.PASSWORD_HASHER_PROFILES[profile]]
+    settings.PASSWORD_HASHER_PARAMS = {
+        **settings.PASSWORD_HASHER_PARAMS,
+        'SCRYPT_WORK_FACTOR': 2 ** 10,
+        'ARGON2_TIME_COST': 1,
+        'ARGON2_MEMORY_COST': 1024,
+        'ARGON2_PARALLELISM': 1,
+    }
+    encoded = make_password(PASSWORD)
+    assert encoded.startswith(prefix)
+    assert check_password(PASSWORD, encoded)
+    assert not check_password('wrong', encoded)
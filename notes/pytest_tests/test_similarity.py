@@ -0,0 +1,125 @@
+"""Тесты поиска похожих заметок."""
+from io import StringIO
+
+import numpy as np
+import pytest
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from notes.maintenance import explain
+from notes.models import Note, NoteBucket, NoteSignature
+from notes.queue import run_pending
+from notes.similarity import (
+    BANDS, NUM_PERM, candidate_buckets, find_clusters, signature,
+    similar_notes, similarity, update_signature,
+)
+
+RECIPE = (
+    'Рецепт блинов: два яйца, пол-литра молока, стакан муки, ложка '
+    'сахара и щепотка соли. Жарить на раскалённой сковороде.'
+)
+RECIPE_COPY = RECIPE.replace('два яйца', 'три яйца') + ' Подавать со сметаной.'
+OTHER = 'План поездки: билеты на поезд, гостиница у вокзала, музей и парк.'
+
+
+def make_note(author, slug, text):
+    note = Note.objects.create(
+        title=slug, text=text, slug=slug, author=author
+    )
+    update_signature(note)
+    return note
+
+
+def estimate(first, second):
+    return similarity(signature(first)[None, :], signature(second))[0]
+
+
+def test_signature_estimates_similarity():
+    assert signature(RECIPE).shape == (NUM_PERM,)
+    assert estimate(RECIPE, RECIPE.upper()) == 1
+    assert estimate(RECIPE, RECIPE_COPY) > 0.6
+    assert estimate(RECIPE, OTHER) < 0.2
+    assert signature('   ') is None
+    assert signature('Да').shape == (NUM_PERM,)
+
+
+def test_signature_computed_by_queue(
+    author, settings, django_capture_on_commit_callbacks
+):
+    settings.TASK_QUEUE_NOTE_DELAY = 0
+    with django_capture_on_commit_callbacks(execute=True):
+        note = Note.objects.create(
+            title='Блины', text=RECIPE, slug='pancakes', author=author
+        )
+    run_pending()
+    stored = NoteSignature.objects.get(note=note)
+    assert len(stored.signature) == NUM_PERM * 4
+    assert NoteBucket.objects.filter(note=note).count() == BANDS
+
+
+def test_unchanged_text_not_reindexed(note, django_assert_num_queries):
+    update_signature(note)
+    with django_assert_num_queries(1):
+        update_signature(note)
+
+
+def test_endpoint_suggests_own_similar_notes(
+    author, author_client, not_author
+):
+    make_note(author, 'pancakes', RECIPE)
+    make_note(author, 'trip', OTHER)
+    make_note(not_author, 'stolen', RECIPE)
+    response = author_client.post(
+        reverse('notes:similar'), {'text': RECIPE_COPY}
+    )
+    results = response.json()['results']
+    assert [note['title'] for note in results] == ['pancakes']
+    assert results[0]['url'] == reverse('notes:detail', args=('pancakes',))
+    response = author_client.post(
+        reverse('notes:similar'), {'text': RECIPE, 'note': 'pancakes'}
+    )
+    assert response.json() == {'results': []}
+
+
+def test_candidates_limited_to_author(author, not_author):
+    own = make_note(author, 'pancakes', RECIPE)
+    make_note(not_author, 'stolen', RECIPE)
+    buckets = candidate_buckets(author, signature(RECIPE))
+    assert set(buckets.values_list('note_id', flat=True)) == {own.pk}
+    assert 'notebucket_author_key_idx (author_id=? AND key=?)' in (
+        explain(buckets)[0]
+    )
+
+
+def test_author_change_rebuilds_buckets(author, not_author):
+    note = make_note(author, 'secret', RECIPE)
+    note.author = not_author
+    note.save()
+    assert similar_notes(author, RECIPE) == []
+    update_signature(note)
+    assert not NoteBucket.objects.filter(author=author).exists()
+    assert similar_notes(not_author, RECIPE) == [(note, 1.0)]
+
+
+def test_find_clusters():
+    texts = [RECIPE, OTHER, RECIPE_COPY, OTHER + ' Взять зонт.', 'Другое']
+    matrix = np.stack([signature(text) for text in texts])
+    assert find_clusters([10, 11, 12, 13, 14], matrix, 0.5) == [
+        [10, 12], [11, 13]
+    ]
+
+
+@pytest.mark.parametrize('index', (True, False))
+def test_find_duplicates_command(author, index):
+    for slug, text in (('a', RECIPE), ('b', RECIPE_COPY), ('c', OTHER)):
+        Note.objects.create(title=slug, text=text, slug=slug, author=author)
+    out = StringIO()
+    call_command(
+        'find_duplicates', user=author.username, index=index, stdout=out
+    )
+    if index:
+        assert 'групп похожих: 1' in out.getvalue()
+        assert '  a, b' in out.getvalue()
+    else:
+        assert 'групп похожих: 0' in out.getvalue()
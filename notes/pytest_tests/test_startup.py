@@ -0,0 +1,81 @@
+"""Тесты времени старта воркера."""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.urls import reverse
+
+from notes.warmup import warm_up
+
+# Бюджет на импорт yanote.wsgi в чистом интерпретаторе, в секундах. С
+# запасом на медленные машины CI; переопределяется YANOTE_BOOT_BUDGET.
+BOOT_BUDGET = float(os.getenv('YANOTE_BOOT_BUDGET', '1.5'))
+# Не нужны для старта: загружаются при первом использовании.
+LAZY_MODULES = ('numpy', 'pytils')
+
+BOOT = '''
+import json, sys, time
+started = time.perf_counter()
+import yanote.wsgi
+print(json.dumps({
+    'seconds': time.perf_counter() - started,
+    'loaded': [name for name in sys.argv[1:] if name in sys.modules],
+}))
+'''
+
+# Хук gunicorn в новом процессе, где Django ещё не настроен.
+WORKER_INIT = '''
+import json, types
+from notes import warmup
+messages = []
+worker = types.SimpleNamespace(
+    pid=1, log=types.SimpleNamespace(info=lambda *args: messages.append(args))
+)
+warmup.post_worker_init(worker)
+print(json.dumps(messages))
+'''
+
+
+def run(script, *args):
+    result = subprocess.run(
+        [sys.executable, '-c', script, *args],
+        capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'yanote.settings'},
+    )
+    return json.loads(result.stdout)
+
+
+def boot():
+    return run(BOOT, *LAZY_MODULES)
+
+
+def test_boot_time_within_budget():
+    runs = [boot() for _ in range(3)]
+    assert statistics.median(run['seconds'] for run in runs) < BOOT_BUDGET
+    assert runs[0]['loaded'] == []
+
+
+def test_warm_up_loads_urls_and_templates():
+    stats = warm_up()
+    assert stats['urls'] > 0
+    assert stats['templates'] >= 10
+    assert reverse('notes:home') == '/'
+
+
+def test_gunicorn_hook_in_fresh_worker():
+    [message] = run(WORKER_INIT)
+    assert message[0].startswith('Воркер %s прогрет')
+    assert message[3] >= 10
+
+
+def test_startup_profile_command():
+    out = StringIO()
+    call_command('startup_profile', repeat=1, top=3, stdout=out)
+    output = out.getvalue()
+    assert 'django.setup()' in output
+    assert 'Пакеты по собственному времени импорта:' in output
@@ -0,0 +1,81 @@
+"""Тесты сборки статики и сжатия ответов."""
+import gzip
+from http import HTTPStatus
+
+import pytest
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+CSS = 'css/bootstrap.min.css'
+
+
+@pytest.fixture(scope='session')
+def static_root(tmp_path_factory):
+    """Статика собирается один раз: сжатие CSS заметно по времени."""
+    path = tmp_path_factory.mktemp('static')
+    with override_settings(STATIC_ROOT=path):
+        call_command('collectstatic', interactive=False, verbosity=0)
+    return path
+
+
+@pytest.fixture
+def collected(settings, static_root):
+    settings.STATIC_ROOT = static_root
+    return staticfiles_storage.stored_name(CSS)
+
+
+def test_collectstatic_writes_gzip_copy(collected):
+    assert collected != CSS
+    with staticfiles_storage.open(collected) as original:
+        data = original.read()
+    with staticfiles_storage.open(collected + '.gz') as compressed:
+        assert gzip.decompress(compressed.read()) == data
+
+
+def test_hashed_static_served_compressed_and_immutable(client, collected):
+    response = client.get(
+        f'/static/{collected}', HTTP_ACCEPT_ENCODING='gzip, deflate'
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'] == 'text/css'
+    assert 'immutable' in response['Cache-Control']
+    assert 'Accept-Encoding' in response['Vary']
+
+
+def test_static_without_gzip_support(client, collected):
+    response = client.get(
+        f'/static/{collected}', HTTP_ACCEPT_ENCODING='gzip;q=0'
+    )
+    assert not response.has_header('Content-Encoding')
+
+
+@pytest.mark.parametrize(
+    'path', ('/static/../manage.py', '/static/css/missing.css')
+)
+def test_static_outside_root_not_served(client, collected, path):
+    response = client.get(path)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_pages_link_local_css(client, collected):
+    response = client.get(reverse('notes:home'))
+    assert f'/static/{collected}' in response.content.decode()
+
+
+def test_missing_manifest_fails_in_production(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    assert staticfiles_storage.stored_name(CSS) == CSS
+    settings.STATICFILES_ALLOW_UNHASHED = False
+    with pytest.raises(ValueError):
+        staticfiles_storage.stored_name(CSS)
+
+
+def test_html_compressed(client):
+    response = client.get(
+        reverse('notes:home'), HTTP_ACCEPT_ENCODING='gzip'
+    )
+    assert response['Content-Encoding'] == 'gzip'
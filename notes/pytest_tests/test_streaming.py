@@ -0,0 +1,73 @@
+"""Тесты потоковой выгрузки списка заметок."""
+import csv
+import io
+
+import pytest
+
+from django.urls import reverse
+
+from notes.models import Note
+from notes.views import NotesList
+
+NOTES_COUNT = 7
+
+
+@pytest.fixture
+def many_notes(author, not_author, monkeypatch):
+    # Маленькие порции, чтобы проверить склейку нескольких порций.
+    monkeypatch.setattr(NotesList, 'stream_chunk_size', 3)
+    Note.objects.bulk_create(
+        Note(
+            title=f'Заметка <{i}>', text='Текст', slug=f'n-{i}', author=author
+        )
+        for i in range(NOTES_COUNT)
+    )
+    Note.objects.create(
+        title='Чужая', text='Текст', slug='other', author=not_author
+    )
+    return Note.objects.filter(author=author).order_by('id')
+
+
+def get_stream(client, export_format):
+    response = client.get(reverse('notes:list'), {'format': export_format})
+    assert response.streaming
+    return response
+
+
+def test_html_stream_contains_all_author_notes(author_client, many_notes):
+    streamed = b''.join(
+        get_stream(author_client, 'stream').streaming_content
+    ).decode()
+    for note in many_notes:
+        assert reverse('notes:detail', args=(note.slug,)) in streamed
+    assert 'Заметка &lt;0&gt;' in streamed
+    assert 'Чужая' not in streamed
+    # Страница целиком, включая шапку и закрывающие теги.
+    assert '<h2>Список заметок</h2>' in streamed
+    assert streamed.rstrip().endswith('</html>')
+
+
+def test_html_stream_sends_page_head_before_querying_notes(
+    author_client, many_notes, django_assert_num_queries
+):
+    content = get_stream(author_client, 'stream').streaming_content
+    with django_assert_num_queries(0):
+        head = next(content)
+    assert '<html>' in head.decode()
+
+
+def test_csv_stream(author_client, many_notes):
+    response = get_stream(author_client, 'csv')
+    assert response['Content-Type'].startswith('text/csv')
+    content = b''.join(response.streaming_content).decode()
+    rows = list(csv.reader(io.StringIO(content)))
+    assert rows[0] == ['id', 'title', 'slug']
+    assert rows[1:] == [
+        [str(note.id), note.title, note.slug] for note in many_notes
+    ]
+
+
+def test_text_stream(author_client, many_notes):
+    response = get_stream(author_client, 'txt')
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert lines == [f'{note.id}: {note.title}' for note in many_notes]
@@ -0,0 +1,190 @@
+"""
+Очередь фоновых задач в той же БД SQLite, без внешнего брокера.
+
+Задача - функция, зарегистрированная декоратором task. Её вызов ставится
+в очередь функцией enqueue и выполняется воркером manage.py run_workers.
+
+- Ключ идемпотентности: в очереди одновременно не больше одной ожидающей
+  задачи с одинаковым ключом. Повторная постановка не создаёт новую
+  задачу, а обновляет аргументы уже ожидающей (coalescing).
+- Упавшая задача перезапускается с экспоненциальной задержкой, пока не
+  кончатся попытки, после чего остаётся в статусе failed.
+- Задачи, зарегистрированные через note_task, ставятся в очередь после
+  сохранения заметки с ключом по её id, так что серия правок одной
+  заметки выполняется одной задачей.
+"""
+import logging
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+_note_tasks = []
+
+
+def task(func=None, *, name=None):
+    """Регистрирует функцию как фоновую задачу."""
+    def register(func):
+        func.task_name = name or f'{func.__module__}.{func.__qualname__}'
+        _registry[func.task_name] = func
+        return func
+    return register(func) if func is not None else register
+
+
+def note_task(func):
+    """Задача, которая запускается после каждого сохранения заметки."""
+    task(func)
+    _note_tasks.append(func)
+    return func
+
+
+def enqueue(func, payload=None, key=None, delay=0, max_attempts=None):
+    """
+    Ставит задачу в очередь, возвращает её id.
+
+    Если задача с таким же ключом уже ждёт выполнения, новая не создаётся:
+    у ожидающей обновляются аргументы, а срок запуска не откладывается.
+    """
+    name = getattr(func, 'task_name', func)
+    if name not in _registry:
+        raise KeyError(f'Задача {name} не зарегистрирована')
+    payload = payload or {}
+    key = key or uuid.uuid4().hex
+    while True:
+        try:
+            with transaction.atomic():
+                return Task.objects.create(
+                    name=name,
+                    key=key,
+                    payload=payload,
+                    run_after=timezone.now() + timedelta(seconds=delay),
+                    max_attempts=(
+                        max_attempts or settings.TASK_QUEUE_MAX_ATTEMPTS
+                    ),
+                ).pk
+        except IntegrityError:
+            pending = Task.objects.filter(key=key, status=Task.PENDING)
+            pk = pending.values_list('pk', flat=True).first()
+            if pk is not None and pending.filter(pk=pk).update(
+                payload=payload
+            ):
+                return pk
+            # Воркер успел забрать ожидающую задачу: ключ свободен, новая
+            # встанет в очередь за выполняющейся.
+
+
+def enqueue_note_tasks(note):
+    for func in _note_tasks:
+        enqueue(
+            func,
+            payload={'note_id': note.pk},
+            key=f'{func.task_name}:{note.pk}',
+            delay=settings.TASK_QUEUE_NOTE_DELAY,
+        )
+
+
+def claim(limit):
+    """Переводит до limit готовых задач в статус running, возвращает id."""
+    now = timezone.now()
+    candidates = Task.objects.filter(
+        status=Task.PENDING, run_after__lte=now
+    ).order_by('run_after').values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in candidates:
+        # Условное обновление: задачу забирает только один воркер.
+        if Task.objects.filter(pk=pk, status=Task.PENDING).update(
+            status=Task.RUNNING,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        ):
+            claimed.append(pk)
+    return claimed
+
+
+def run_task(pk):
+    """Выполняет задачу. Успешная задача удаляется из очереди."""
+    job = Task.objects.get(pk=pk)
+    started = time.monotonic()
+    try:
+        _registry[job.name](**job.payload)
+    except Exception:
+        retry(job, traceback.format_exc())
+        return False
+    Task.objects.filter(pk=pk).delete()
+    logger.info(
+        'Задача %s выполнена за %.3f с', job, time.monotonic() - started
+    )
+    return True
+
+
+def retry(job, error):
+    if job.attempts >= job.max_attempts:
+        logger.error('Задача %s не выполнена: %s', job, error)
+        Task.objects.filter(pk=job.pk).update(
+            status=Task.FAILED, last_error=error
+        )
+        return
+    backoff = settings.TASK_QUEUE_RETRY_DELAY * 2 ** (job.attempts - 1)
+    logger.warning('Задача %s упала, повтор через %s с', job, backoff)
+    try:
+        with transaction.atomic():
+            Task.objects.filter(pk=job.pk).update(
+                status=Task.PENDING,
+                run_after=timezone.now() + timedelta(seconds=backoff),
+                last_error=error,
+            )
+    except IntegrityError:
+        # Пока задача выполнялась, в очередь встала такая же - она и
+        # сделает работу со свежими данными.
+        Task.objects.filter(pk=job.pk).delete()
+
+
+def requeue_stale(timeout):
+    """Возвращает в очередь задачи, чей воркер пропал."""
+    stale = Task.objects.filter(
+        status=Task.RUNNING,
+        started_at__lt=timezone.now() - timedelta(seconds=timeout),
+    )
+    requeued = 0
+    for pk in stale.values_list('pk', flat=True):
+        try:
+            with transaction.atomic():
+                requeued += Task.objects.filter(
+                    pk=pk, status=Task.RUNNING
+                ).update(status=Task.PENDING)
+        except IntegrityError:
+            Task.objects.filter(pk=pk).delete()
+    return requeued
+
+
+def run_pending(limit=100):
+    """Выполняет готовые задачи в текущем потоке. Удобно в тестах."""
+    return [run_task(pk) for pk in claim(limit)]
+
+
+def queue_stats():
+    """Глубина очереди и задержка самой старой готовой задачи."""
+    now = timezone.now()
+    counts = dict.fromkeys((Task.PENDING, Task.RUNNING, Task.FAILED), 0)
+    counts.update(
+        Task.objects.values_list('status').annotate(Count('pk')).order_by()
+    )
+    oldest = Task.objects.filter(
+        status=Task.PENDING, run_after__lte=now
+    ).aggregate(oldest=Min('run_after'))['oldest']
+    return {
+        'depth': counts[Task.PENDING],
+        'running': counts[Task.RUNNING],
+        'failed': counts[Task.FAILED],
+        'lag': (now - oldest).total_seconds() if oldest else 0.0,
+    }
@@ -0,0 +1,109 @@
+"""
+Ограничение частоты запросов алгоритмом token bucket.
+
+Корзины хранятся в памяти процесса. У каждого ключа (IP-адрес или имя
+пользователя) есть запас токенов BURST, который пополняется со скоростью
+RATE токенов в секунду. Запрос без свободного токена отклоняется до того,
+как дело дойдёт до хеширования пароля.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import HttpResponse
+
+TOO_MANY_REQUESTS = 'Слишком много попыток. Повторите позже.'
+
+
+class TokenBucketLimiter:
+    """Набор корзин токенов с общими скоростью и ёмкостью."""
+
+    def __init__(self, rate, burst, max_keys=100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, now=None):
+        """
+        Забирает токен из корзины ключа.
+
+        Возвращает 0, если запрос разрешён, иначе - сколько секунд ждать
+        до появления следующего токена.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / self.rate
+            # Самые давние ключи вытесняются: их корзины уже полные.
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(kind):
+    """Возвращает ограничитель для 'ip' или 'username' из RATE_LIMITS."""
+    with _limiters_lock:
+        if kind not in _limiters:
+            config = settings.RATE_LIMITS[kind]
+            _limiters[kind] = TokenBucketLimiter(
+                config['RATE'], config['BURST']
+            )
+        return _limiters[kind]
+
+
+def reset_limiters():
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def get_client_ip(request):
+    if settings.RATE_LIMIT_TRUST_X_FORWARDED_FOR:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class RateLimitMixin:
+    """Отклоняет POST-запросы сверх лимитов по IP и имени пользователя."""
+
+    rate_limit_field = 'username'
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == 'POST':
+            wait = self.check_rate_limit(request)
+            if wait:
+                response = HttpResponse(
+                    TOO_MANY_REQUESTS, status=HTTPStatus.TOO_MANY_REQUESTS
+                )
+                response['Retry-After'] = math.ceil(wait)
+                return response
+        return super().dispatch(request, *args, **kwargs)
+
+    def check_rate_limit(self, request):
+        wait = get_limiter('ip').consume(get_client_ip(request))
+        if wait:
+            return wait
+        username = request.POST.get(self.rate_limit_field, '').lower()
+        if username:
+            return get_limiter('username').consume(username)
+        return 0
@@ -0,0 +1,21 @@
+ARCHIVE_DB = 'archive'
+
+
+class ArchiveRouter:
+    """Направляет ArchivedText в архивную БД, всё остальное - в основную."""
+
+    archive_models = {'archivedtext'}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.model_name in self.archive_models:
+            return ARCHIVE_DB
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if model_name in self.archive_models:
+            return db == ARCHIVE_DB
+        if db == ARCHIVE_DB:
+            return False
+        return None
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .autocomplete import titles
+from .backends import invalidate_user
+from .microcache import public_notes
+from .models import ArchivedText, Note, NoteBody
+from .queue import enqueue_note_tasks
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def drop_cached_user(sender, instance, **kwargs):
+    """Сбрасывает пользователя из кеша аутентификации при изменении."""
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Note)
+def schedule_note_tasks(sender, instance, **kwargs):
+    """Ставит производные задачи заметки в очередь после коммита."""
+    transaction.on_commit(lambda: enqueue_note_tasks(instance))
+
+
+@receiver(post_delete, sender=Note)
+def release_note_body(sender, instance, **kwargs):
+    """Убирает ссылку удалённой заметки на общий текст."""
+    if instance.body_id:
+        NoteBody.release(instance.body_id)
+
+
+@receiver(post_save, sender=Note)
+def index_note_title(sender, instance, **kwargs):
+    """Обновляет подсказки заголовков после коммита."""
+    transaction.on_commit(lambda: titles.note_saved(instance))
+
+
+@receiver(post_delete, sender=Note)
+def unindex_note_title(sender, instance, **kwargs):
+    # После удаления у экземпляра сбрасывается pk, запоминаем его сейчас.
+    author_id, pk = instance.author_id, instance.pk
+    transaction.on_commit(lambda: titles.note_deleted(author_id, pk))
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def drop_public_note(sender, instance, **kwargs):
+    """
+    Сбрасывает публичную страницу заметки после коммита.
+
+    До коммита другие запросы ещё видят старую версию и снова положили бы
+    её в кеш. Если сменился slug, страница по старому адресу живёт не
+    дольше PUBLIC_NOTE_CACHE_TTL.
+    """
+    slug = instance.slug
+    transaction.on_commit(lambda: public_notes.invalidate(slug))
+
+
+@receiver(post_delete, sender=Note)
+def drop_archived_text(sender, instance, **kwargs):
+    """Удаляет из архива текст удалённой заметки после коммита."""
+    if instance.archived:
+        pk = instance.pk
+        transaction.on_commit(
+            lambda: ArchivedText.objects.filter(note_id=pk).delete()
+        )
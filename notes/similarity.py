@@ -0,0 +1,225 @@
+"""
+Поиск похожих заметок по MinHash и LSH.
+
+Текст нормализуется и режется на шинглы - перекрывающиеся куски по
+SHINGLE_SIZE символов. MinHash-подпись - NUM_PERM минимумов хешей
+шинглов по разным хеш-функциям; доля совпавших позиций двух подписей
+оценивает коэффициент Жаккара множеств шинглов. Подпись хранится в
+NoteSignature как NUM_PERM чисел uint32.
+
+Для поиска без попарного сравнения подпись делится на BANDS полос по
+ROWS чисел, хеш каждой полосы - ключ корзины (NoteBucket). Кандидаты -
+заметки, у которых совпала хотя бы одна корзина; точная оценка
+сходства считается только для них. При 32 полосах по 4 числа пара со
+сходством 0.5 попадает в кандидаты с вероятностью 87%, 0.8 - почти
+наверняка.
+
+Подписи пересчитываются фоновой задачей notes.tasks.index_note после
+сохранения заметки. Модуль тянет NumPy, поэтому при старте процесса он
+не импортируется: только при первом поиске или запуске задачи.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists
+
+from .models import Note, NoteBody, NoteBucket, NoteSignature
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# Шинглы обрабатываются порциями, чтобы матрица NUM_PERM x порция
+# не росла с длиной текста.
+CHUNK_SIZE = 8192
+
+MASK32 = np.uint64(0xFFFFFFFF)
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20240501)
+# Хеш-функции (a * h + b) mod p со случайными a, b < p. Произведение
+# переполняет uint64 и берётся по модулю 2**64, это только добавляет
+# перемешивания. С маленькими a минимум почти всегда давали бы шинглы с
+# маленькими h, и подписи разных текстов совпадали бы.
+_A = _rng.integers(1, MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+_BAND_SALT = np.arange(BANDS, dtype=np.uint64) * np.uint64(
+    0x9E3779B97F4A7C15
+)
+
+
+def normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def shingle_hashes(text):
+    """Уникальные 32-битные хеши шинглов текста."""
+    codes = np.frombuffer(
+        normalize(text).encode('utf-32-le'), dtype=np.uint32
+    ).astype(np.uint64)
+    if not len(codes):
+        return codes
+    size = min(SHINGLE_SIZE, len(codes))
+    count = len(codes) - size + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        # FNV-1a по символам шингла сразу для всех шинглов.
+        hashes = (hashes ^ codes[offset:offset + count]) * np.uint64(
+            0x100000001B3
+        )
+    return np.unique((hashes ^ (hashes >> np.uint64(32))) & MASK32)
+
+
+def signature(text):
+    """MinHash-подпись текста, массив NUM_PERM x uint32; None для пустого."""
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return None
+    result = np.full(NUM_PERM, MERSENNE_PRIME, dtype=np.uint64)
+    for start in range(0, len(hashes), CHUNK_SIZE):
+        chunk = hashes[start:start + CHUNK_SIZE]
+        values = (np.outer(_A, chunk) + _B[:, None]) % MERSENNE_PRIME
+        np.minimum(result, values.min(axis=1), out=result)
+    return (result & MASK32).astype(np.uint32)
+
+
+def band_keys(signatures):
+    """Ключи корзин LSH: массив (число подписей, BANDS) int64."""
+    bands = signatures.astype(np.uint64).reshape(-1, BANDS, ROWS)
+    keys = np.zeros(bands.shape[:2], dtype=np.uint64)
+    for row in range(ROWS):
+        keys = (keys ^ bands[:, :, row]) * np.uint64(0x100000001B3)
+    return (keys ^ _BAND_SALT).view(np.int64)
+
+
+def similarity(matrix, sig):
+    """Оценка сходства каждой строки matrix с подписью sig."""
+    return (matrix == sig).mean(axis=1)
+
+
+def load_signatures(queryset):
+    """Подписи в виде (список id заметок, матрица подписей)."""
+    pks, rows = [], []
+    for pk, data in queryset.values_list('note_id', 'signature'):
+        pks.append(pk)
+        rows.append(np.frombuffer(data, dtype=np.uint32))
+    if not rows:
+        return pks, np.empty((0, NUM_PERM), dtype=np.uint32)
+    return pks, np.stack(rows)
+
+
+def update_signature(note):
+    """
+    Пересчитывает подпись заметки, если изменился её текст или автор: в
+    корзинах хранится копия автора.
+    """
+    text = note.text
+    digest = NoteBody.digest_for(text)
+    stale_buckets = NoteBucket.objects.filter(note=note).exclude(
+        author_id=note.author_id
+    )
+    if NoteSignature.objects.filter(note=note, digest=digest).exclude(
+        Exists(stale_buckets)
+    ).exists():
+        return
+    sig = signature(text)
+    with transaction.atomic():
+        NoteBucket.objects.filter(note=note).delete()
+        if sig is None:
+            NoteSignature.objects.filter(note=note).delete()
+            return
+        NoteSignature.objects.update_or_create(
+            note=note,
+            defaults={'signature': sig.tobytes(), 'digest': digest},
+        )
+        NoteBucket.objects.bulk_create(
+            NoteBucket(note=note, author_id=note.author_id, key=key)
+            for key in band_keys(sig).ravel().tolist()
+        )
+
+
+def candidate_buckets(user, sig):
+    """
+    Корзины заметок пользователя с теми же ключами, что у подписи sig.
+
+    Поиск идёт по индексу (автор, ключ), поэтому кандидатов не больше,
+    чем заметок у пользователя, сколько бы похожих текстов ни было у
+    других.
+    """
+    return NoteBucket.objects.filter(
+        author=user, key__in=band_keys(sig).ravel().tolist()
+    )
+
+
+def similar_notes(user, text, exclude=None, limit=5):
+    """
+    Заметки пользователя, похожие на текст: список пар (заметка, сходство)
+    по убыванию сходства, не ниже SIMILARITY_THRESHOLD.
+    """
+    sig = signature(text)
+    if sig is None:
+        return []
+    candidates = set(candidate_buckets(user, sig).values_list(
+        'note_id', flat=True
+    ))
+    if exclude is not None:
+        candidates.discard(exclude.pk)
+    pks, matrix = load_signatures(
+        # Автор в корзинах - копия; владельца проверяем по самой заметке.
+        NoteSignature.objects.filter(note__in=candidates, note__author=user)
+    )
+    if not pks:
+        return []
+    scores = similarity(matrix, sig)
+    best = [
+        (pks[i], float(scores[i]))
+        for i in np.argsort(-scores, kind='stable')[:limit]
+        if scores[i] >= settings.SIMILARITY_THRESHOLD
+    ]
+    notes = Note.objects.only('title', 'slug').in_bulk(
+        [pk for pk, _ in best]
+    )
+    return [(notes[pk], score) for pk, score in best if pk in notes]
+
+
+def find_clusters(pks, matrix, threshold):
+    """
+    Группы похожих заметок среди подписей matrix.
+
+    Сравниваются только заметки из общих корзин LSH. Внутри корзины
+    заметка сравнивается не со всеми, а с представителями уже найденных
+    групп, поэтому корзина из тысяч копий одного шаблона не даёт
+    квадратичного числа сравнений. Группы собираются через систему
+    непересекающихся множеств.
+    """
+    parent = list(range(len(pks)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    keys = band_keys(matrix)
+    for band in range(BANDS):
+        order = np.argsort(keys[:, band], kind='stable')
+        column = keys[order, band]
+        starts = np.flatnonzero(np.r_[True, column[1:] != column[:-1]])
+        for group in np.split(order, starts[1:]):
+            if len(group) < 2:
+                continue
+            representatives = [group[0]]
+            for member in group[1:]:
+                scores = similarity(
+                    matrix[representatives], matrix[member]
+                )
+                matched = np.flatnonzero(scores >= threshold)
+                if not matched.size:
+                    representatives.append(member)
+                for k in matched:
+                    parent[root(representatives[k])] = root(member)
+    clusters = {}
+    for i, pk in enumerate(pks):
+        clusters.setdefault(root(i), []).append(pk)
+    return [
+        sorted(cluster) for cluster in clusters.values() if len(cluster) > 1
+    ]
@@ -0,0 +1,65 @@
+"""
+Хранилище статики с отпечатками в именах и заранее сжатыми копиями.
+
+collectstatic кладёт рядом с каждым файлом с хешем в имени его сжатые
+варианты .gz и, если установлен пакет brotli, .br. Отдаёт их
+notes.middleware.StaticFilesMiddleware.
+"""
+import gzip
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.txt', '.map', '.json')
+
+
+def _compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        for hashed_name in sorted(hashed_names):
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            data = original.read()
+        for extension, compress in _compressors():
+            compressed = compress(data)
+            # Сжатая копия бесполезна, если она не меньше оригинала.
+            if len(compressed) >= len(data):
+                continue
+            compressed_name = name + extension
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # При разработке collectstatic могли ещё не запускать - тогда
+            # ссылаемся на исходный файл (STATICFILES_ALLOW_UNHASHED). Иначе,
+            # как и ManifestStaticFilesStorage, падаем: файлы без хеша не
+            # получат вечного кеширования в браузере.
+            if self.hashed_files or not settings.STATICFILES_ALLOW_UNHASHED:
+                raise
+            return name
@@ -0,0 +1,40 @@
+"""
+Фоновые задачи заметок (см. notes.queue).
+
+Модуль импортируется при старте, чтобы задачи были зарегистрированы и в
+веб-процессах, которые ставят их в очередь. Тяжёлые зависимости задач
+импортируются только при их выполнении.
+"""
+from django.conf import settings
+from django.db import connections
+
+from .models import Note
+from .queue import enqueue, note_task, task
+
+
+@note_task
+def index_note(note_id):
+    """Пересчитывает MinHash-подпись заметки для поиска похожих."""
+    from .similarity import update_signature
+
+    note = Note.objects.filter(pk=note_id).first()
+    if note is not None:
+        update_signature(note)
+
+
+@task
+def optimize_database():
+    """
+    Обновляет статистику планировщика во всех БД SQLite и ставит
+    следующий запуск через DB_OPTIMIZE_INTERVAL секунд.
+    """
+    from .maintenance import optimize, sqlite_aliases
+
+    for alias in sqlite_aliases():
+        with connections[alias].cursor() as cursor:
+            optimize(cursor)
+    enqueue(
+        optimize_database,
+        key=optimize_database.task_name,
+        delay=settings.DB_OPTIMIZE_INTERVAL,
+    )
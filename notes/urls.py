@@ -8,9 +8,15 @@ urlpatterns = [
     path('', views.Home.as_view(), name='home'),
     path('add/', views.NoteCreate.as_view(), name='add'),
     path('edit/<slug:note_slug>/', views.NoteUpdate.as_view(), name='edit'),
+    path('edit/<slug:note_slug>/patch/', views.NotePatch.as_view(),
+         name='patch'),
     path('note/<slug:note_slug>/', views.NoteDetail.as_view(), name='detail'),
+    path('p/<slug:note_slug>/', views.PublicNote.as_view(), name='public'),
     path('delete/<slug:note_slug>/', views.NoteDelete.as_view(),
          name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('autocomplete/', views.NoteAutocomplete.as_view(),
+         name='autocomplete'),
+    path('similar/', views.NoteSimilar.as_view(), name='similar'),
 ]
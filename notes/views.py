@@ -1,9 +1,26 @@
+import csv
+import json
+import uuid
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import views as auth_views
+from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.http import JsonResponse
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.urls import reverse, reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
+from .autocomplete import titles
+from .forms import CONFLICT, NoteForm
+from .microcache import public_notes
 from .models import Note
+from .patches import apply_ops
+from .ratelimit import RateLimitMixin
 
 
 class Home(generic.TemplateView):
@@ -51,6 +68,71 @@ class NoteUpdate(NoteBase, generic.UpdateView):
     template_name = 'notes/form.html'
     form_class = NoteForm
 
+    def form_valid(self, form):
+        self.object = form.save(commit=False)
+        version = form.cleaned_data['version']
+        if version is None:
+            version = self.object.version
+        if not self.object.save_if_version(version):
+            form.add_error(None, CONFLICT)
+            return self.form_invalid(form)
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class NotePatch(NoteBase, generic.detail.SingleObjectMixin, generic.View):
+    """
+    Частичное обновление заметки запросом PATCH.
+
+    Тело - JSON {"version": 3, "title": "...", "ops": [[start, end, text]]}:
+    версия, от которой сделаны правки, необязательный новый заголовок и
+    правки текста из notes.patches. Если заметку успели изменить, ответ
+    409 с текущей версией. В БД пишутся только изменившиеся поля.
+    """
+
+    http_method_names = ['patch']
+
+    def patch(self, request, *args, **kwargs):
+        note = self.get_object()
+        try:
+            data = json.loads(request.body)
+            version = data['version']
+            if type(version) is not int:
+                raise ValueError('version должен быть числом')
+        except (ValueError, KeyError, TypeError) as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        if version != note.version:
+            return self.conflict(note)
+        try:
+            changed = self.apply_changes(note, data)
+        except ValidationError as error:
+            return JsonResponse({'error': error.messages}, status=400)
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        if changed and not note.save_if_version(version, changed):
+            note.refresh_from_db(fields=('version',))
+            return self.conflict(note)
+        return JsonResponse({'version': note.version})
+
+    def apply_changes(self, note, data):
+        """Меняет поля заметки по запросу, возвращает имена изменённых."""
+        changed = set()
+        if 'title' in data and data['title'] != note.title:
+            note.title = note._meta.get_field('title').clean(
+                data['title'], note
+            )
+            changed.add('title')
+        if data.get('ops'):
+            text = apply_ops(note.text, data['ops'])
+            if text != note.text:
+                note.text = note._meta.get_field('text').clean(text, note)
+                changed.add('text')
+        return changed
+
+    def conflict(self, note):
+        return JsonResponse(
+            {'error': CONFLICT, 'version': note.version}, status=409
+        )
+
 
 class NoteDelete(NoteBase, generic.DeleteView):
     """Удаление заметки."""
@@ -58,13 +140,192 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
+class Echo:
+    """Псевдобуфер для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список всех заметок пользователя.
+
+    Параметр ?format=stream|csv|txt включает потоковую выгрузку: строки
+    читаются из БД порциями и отправляются клиенту по мере готовности,
+    поэтому память не растёт с числом заметок.
+    """
 
     template_name = 'notes/list.html'
+    rows_template_name = 'notes/includes/note_items.html'
+    stream_chunk_size = 500
+
+    def get(self, request, *args, **kwargs):
+        stream = {
+            'stream': self.stream_html,
+            'csv': self.stream_csv,
+            'txt': self.stream_text,
+        }.get(request.GET.get('format'))
+        if stream is None:
+            return super().get(request, *args, **kwargs)
+        return stream()
+
+    def iter_notes(self):
+        return self.get_queryset().only(
+            'id', 'title', 'slug'
+        ).order_by('id').iterator(chunk_size=self.stream_chunk_size)
+
+    def stream_html(self):
+        # Страница рендерится без строк, на их место ставится метка.
+        # Строки рендерятся порциями и отдаются между частями страницы.
+        marker = uuid.uuid4().hex
+        self.object_list = self.get_queryset().none()
+        page = render_to_string(
+            self.template_name,
+            self.get_context_data(stream_marker=marker),
+            request=self.request,
+        )
+        head, tail = page.split(marker, 1)
+        rows = get_template(self.rows_template_name)
+
+        def content():
+            yield head
+            for notes in chunked(self.iter_notes(), self.stream_chunk_size):
+                yield rows.render({'notes': notes})
+            yield tail
+
+        return StreamingHttpResponse(content())
+
+    def stream_csv(self):
+        writer = csv.writer(Echo())
+
+        def content():
+            yield writer.writerow(('id', 'title', 'slug'))
+            for note in self.iter_notes():
+                yield writer.writerow((note.id, note.title, note.slug))
+
+        response = StreamingHttpResponse(
+            content(), content_type='text/csv; charset=utf-8'
+        )
+        response['Content-Disposition'] = 'attachment; filename="notes.csv"'
+        return response
+
+    def stream_text(self):
+        content = (
+            f'{note.id}: {note.title}\n' for note in self.iter_notes()
+        )
+        return StreamingHttpResponse(
+            content, content_type='text/plain; charset=utf-8'
+        )
 
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
 
     template_name = 'notes/detail.html'
+
+
+class PublicNote(generic.View):
+    """
+    Опубликованная заметка, доступная по ссылке без входа.
+
+    Страница одна для всех посетителей, поэтому готовый HTML хранится в
+    notes.microcache на PUBLIC_NOTE_CACHE_TTL секунд, а одновременные
+    промахи кеша ждут одного общего запроса к БД.
+    """
+
+    template_name = 'notes/public.html'
+
+    def get(self, request, note_slug):
+        content = public_notes.get_or_compute(
+            note_slug,
+            self.render,
+            settings.PUBLIC_NOTE_CACHE_TTL,
+            # Отсутствие заметки не кешируется: перебор случайных адресов
+            # вытеснял бы из кеша популярные страницы. Одновременные
+            # запросы к одному адресу всё равно ждут одного запроса к БД.
+            store_if=lambda content: content is not None,
+        )
+        if content is None:
+            raise Http404
+        response = HttpResponse(content)
+        response['Cache-Control'] = (
+            f'public, max-age={settings.PUBLIC_NOTE_CACHE_TTL}'
+        )
+        return response
+
+    def get_queryset(self):
+        return Note.objects.filter(
+            slug=self.kwargs['note_slug'], is_public=True
+        )
+
+    def render(self):
+        # Без request в контексте: в закешированную страницу не должны
+        # попасть ни имя пользователя, ни CSRF-токен.
+        note = self.get_queryset().first()
+        if note is None:
+            return None
+        return render_to_string(self.template_name, {'note': note})
+
+
+class NoteAutocomplete(LoginRequiredMixin, generic.View):
+    """Подсказки заголовков заметок для поля «Перейти к заметке»."""
+
+    limit = 10
+
+    def get(self, request):
+        notes = titles.search(
+            request.user.pk, request.GET.get('q', ''), self.limit
+        )
+        return JsonResponse({'results': [
+            {'title': title, 'url': reverse('notes:detail', args=(slug,))}
+            for title, slug in notes
+        ]})
+
+
+class NoteSimilar(LoginRequiredMixin, generic.View):
+    """
+    Похожие заметки пользователя для текста из формы заметки.
+
+    Текст приходит POST-запросом: он может быть длинным. При
+    редактировании параметр note - slug самой заметки, она исключается.
+    """
+
+    limit = 5
+
+    def post(self, request):
+        # NumPy загружается при первом поиске, а не при старте воркера.
+        from .similarity import similar_notes
+
+        exclude = Note.objects.filter(
+            author=request.user, slug=request.POST.get('note', '')
+        ).first()
+        notes = similar_notes(
+            request.user, request.POST.get('text', ''), exclude, self.limit
+        )
+        return JsonResponse({'results': [
+            {
+                'title': note.title,
+                'url': reverse('notes:detail', args=(note.slug,)),
+                'similarity': round(score, 2),
+            }
+            for note, score in notes
+        ]})
+
+
+class Login(RateLimitMixin, auth_views.LoginView):
+    """Вход с ограничением частоты попыток по IP и имени пользователя."""
+
+
+class SignUp(RateLimitMixin, generic.CreateView):
+    """Регистрация с ограничением частоты попыток."""
+
+    form_class = UserCreationForm
+    success_url = '/'
+    template_name = 'registration/signup.html'
@@ -0,0 +1,65 @@
+"""
+Прогрев процесса перед приёмом запросов.
+
+Django загружает URLconf (а с ним все представления) и компилирует
+шаблоны при первом обращении, так что за это платит первый запрос к
+новому воркеру. warm_up() делает то же самое заранее.
+
+Модуль можно передать gunicorn как файл настроек, тогда каждый воркер
+прогревается хуком post_worker_init после загрузки приложения:
+
+    gunicorn yanote.wsgi -c python:notes.warmup
+
+Хук post_fork для этого не подходит: без --preload он вызывается до
+загрузки приложения, когда Django ещё не настроен.
+
+На верхнем уровне модуля нет импортов Django: gunicorn загружает его в
+мастер-процессе до настройки Django.
+"""
+import time
+from pathlib import Path
+
+
+def warm_up():
+    """Загружает URLconf и шаблоны проекта, возвращает статистику."""
+    from django.template import engines
+    from django.urls import get_resolver
+
+    started = time.perf_counter()
+    resolvers = [get_resolver()]
+    urls = 0
+    while resolvers:
+        current = resolvers.pop()
+        # Обращение к reverse_dict заполняет таблицы для reverse().
+        urls += len(current.reverse_dict)
+        resolvers.extend(
+            sub for _, sub in current.namespace_dict.values()
+        )
+    templates = 0
+    for engine in engines.all():
+        for directory in map(Path, getattr(engine, 'dirs', ())):
+            for path in sorted(directory.rglob('*.html')):
+                engine.get_template(
+                    path.relative_to(directory).as_posix()
+                )
+                templates += 1
+    return {
+        'urls': urls,
+        'templates': templates,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def post_worker_init(worker):
+    """Хук gunicorn: прогрев воркера до приёма первого запроса."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        # Приложение без django.setup(), например не yanote.wsgi.
+        django.setup(set_prefix=False)
+    stats = warm_up()
+    worker.log.info(
+        'Воркер %s прогрет за %.3f с: %s шаблонов', worker.pid,
+        stats['seconds'], stats['templates'],
+    )
@@ -0,0 +1,34 @@
+// Поле «Перейти к заметке»: подсказки заголовков и переход к выбранной.
+(function () {
+  const input = document.getElementById('jump-to-note');
+  if (!input) {
+    return;
+  }
+  const options = document.getElementById('jump-to-note-options');
+  let urls = new Map();
+
+  input.addEventListener('input', async function () {
+    const url = urls.get(input.value);
+    if (url) {
+      window.location.href = url;
+      return;
+    }
+    const query = input.value.trim();
+    if (!query) {
+      return;
+    }
+    const response = await fetch(
+      input.dataset.url + '?q=' + encodeURIComponent(query)
+    );
+    if (!response.ok || input.value.trim() !== query) {
+      return;
+    }
+    const data = await response.json();
+    urls = new Map(data.results.map((note) => [note.title, note.url]));
+    options.replaceChildren(...data.results.map(function (note) {
+      const option = document.createElement('option');
+      option.value = note.title;
+      return option;
+    }));
+  });
+})();
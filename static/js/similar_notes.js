@@ -0,0 +1,41 @@
+// Форма заметки: подсказка «У вас уже есть похожие заметки».
+(function () {
+  const box = document.getElementById('similar-notes');
+  const text = document.querySelector('textarea[name="text"]');
+  if (!box || !text) {
+    return;
+  }
+  const list = box.querySelector('ul');
+  const token = document.querySelector('input[name="csrfmiddlewaretoken"]');
+  let timer = null;
+
+  async function check() {
+    const body = new FormData();
+    body.append('text', text.value);
+    body.append('note', box.dataset.note);
+    const response = await fetch(box.dataset.url, {
+      method: 'POST',
+      body: body,
+      headers: {'X-CSRFToken': token.value},
+    });
+    if (!response.ok) {
+      return;
+    }
+    const data = await response.json();
+    list.replaceChildren(...data.results.map(function (note) {
+      const item = document.createElement('li');
+      const link = document.createElement('a');
+      link.href = note.url;
+      link.target = '_blank';
+      link.textContent = note.title;
+      item.append(link, ' (' + Math.round(note.similarity * 100) + '%)');
+      return item;
+    }));
+    box.hidden = !data.results.length;
+  }
+
+  text.addEventListener('input', function () {
+    clearTimeout(timer);
+    timer = setTimeout(check, 500);
+  });
+})();
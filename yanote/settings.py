@@ -1,5 +1,7 @@
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -23,6 +25,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'notes.middleware.StaticFilesMiddleware',
+    'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -56,9 +60,22 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # Воркеры очереди пишут параллельно с веб-процессами: ждём
+        # освобождения блокировки, а не падаем сразу.
+        'OPTIONS': {'timeout': 20},
+    },
+    # Архив давно не изменявшихся заметок (notes.archive): сжатые тексты
+    # в отдельном файле, чтобы не раздувать основную таблицу и её бэкапы.
+    # Схема: python manage.py migrate --database archive.
+    'archive': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'archive.sqlite3',
+        'OPTIONS': {'timeout': 20},
+    },
 }
 
+DATABASE_ROUTERS = ['notes.routers.ArchiveRouter']
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -69,6 +86,134 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Профиль хеширования паролей выбирается переменной окружения
+# YANOTE_PASSWORD_HASHER. Остальные хешеры нужны, чтобы проверять старые
+# хеши; при входе они пересчитываются предпочтительным хешером.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'notes.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'notes.hashers.TunedScryptPasswordHasher',
+    'argon2': 'notes.hashers.TunedArgon2PasswordHasher',
+}
+_preferred_hasher = PASSWORD_HASHER_PROFILES[
+    os.getenv('YANOTE_PASSWORD_HASHER', 'pbkdf2')
+]
+PASSWORD_HASHERS = [_preferred_hasher] + [
+    hasher for hasher in PASSWORD_HASHER_PROFILES.values()
+    if hasher != _preferred_hasher
+]
+PASSWORD_HASHER_PARAMS = {
+    'PBKDF2_ITERATIONS': 870_000,
+    'SCRYPT_WORK_FACTOR': 2 ** 14,
+    'SCRYPT_BLOCK_SIZE': 8,
+    'SCRYPT_PARALLELISM': 5,
+    'ARGON2_TIME_COST': 2,
+    'ARGON2_MEMORY_COST': 102_400,
+    'ARGON2_PARALLELISM': 8,
+}
+
+# Лимиты для входа и регистрации: BURST попыток подряд, затем RATE попыток
+# в секунду. Лишние запросы получают 429 до проверки пароля.
+RATE_LIMITS = {
+    'ip': {'RATE': 1, 'BURST': 20},
+    'username': {'RATE': 0.1, 'BURST': 5},
+}
+# Включать только за доверенным прокси, который перезаписывает заголовок.
+RATE_LIMIT_TRUST_X_FORWARDED_FOR = False
+
+AUTHENTICATION_BACKENDS = [
+    'notes.backends.CachedModelBackend',
+]
+
+# Пользователь кешируется в памяти процесса, чтобы не читать его из БД
+# на каждый запрос. Сбрасывается сигналом при изменении пользователя.
+USER_CACHE_TTL = 60
+USER_CACHE_MAX_SIZE = 10_000
+
+
+# Профиль кеша выбирается переменной окружения YANOTE_CACHE_PROFILE:
+# locmem (по умолчанию) - свой кеш у каждого процесса; file и db - общий
+# для всех процессов на машине или у всех, кто видит БД. Для db таблицу
+# создаёт python manage.py createcachetable. Путь к каталогу для file -
+# YANOTE_CACHE_LOCATION.
+CACHE_PROFILES = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'YANOTE_CACHE_LOCATION', str(BASE_DIR / 'cache')
+        ),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'yanote_cache',
+    },
+}
+CACHE_PROFILE = os.getenv('YANOTE_CACHE_PROFILE', 'locmem')
+CACHES = {'default': CACHE_PROFILES[CACHE_PROFILE]}
+
+# Профиль хранения сессий, переменная YANOTE_SESSION_PROFILE: db (по
+# умолчанию) - стандартное поведение Django, signed_cookies не использует
+# БД вовсе, cached_db читает сессию из кеша и обращается к БД только при
+# промахе. cached_db допустим только с общим кешем (YANOTE_CACHE_PROFILE
+# file или db): выход из аккаунта очищает кеш одного процесса, и в кеше
+# остальных сессия жила бы до истечения срока.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_PROFILE = os.getenv('YANOTE_SESSION_PROFILE', 'db')
+if SESSION_PROFILE == 'cached_db' and CACHE_PROFILE == 'locmem':
+    raise ImproperlyConfigured(
+        'YANOTE_SESSION_PROFILE=cached_db требует общего кеша: '
+        'задайте YANOTE_CACHE_PROFILE=file или db.'
+    )
+SESSION_ENGINE = SESSION_ENGINES[SESSION_PROFILE]
+
+
+# Хранить одинаковые тексты заметок один раз, в таблице NoteBody. Уже
+# сохранённые заметки переводит команда python manage.py dedup_bodies.
+NOTES_DEDUPLICATE_BODIES = os.getenv('YANOTE_DEDUPLICATE_BODIES') == '1'
+
+# Подсказки заголовков заметок (notes.autocomplete): сколько индексов
+# пользователей держать в памяти процесса и сколько секунд им доверять.
+AUTOCOMPLETE_MAX_USERS = 1000
+AUTOCOMPLETE_TTL = 300
+
+# Сколько секунд админка доверяет закешированному числу заметок в
+# отфильтрованном списке. Без фильтров число берётся из sqlite_stat1.
+ADMIN_COUNT_CACHE_TTL = 60
+
+# Сколько секунд публичная страница заметки живёт в кеше процесса
+# (notes.microcache). В других процессах правка видна не позже этого срока.
+PUBLIC_NOTE_CACHE_TTL = 5
+
+# Минимальная оценка сходства (коэффициент Жаккара по шинглам), с которой
+# заметка предлагается как похожая (notes.similarity).
+SIMILARITY_THRESHOLD = 0.5
+
+# Как часто очередь задач обновляет статистику планировщика SQLite
+# (PRAGMA optimize). Первый запуск: python manage.py db_maintenance --schedule.
+DB_OPTIMIZE_INTERVAL = 3600
+
+# Заметки, которые не менялись столько дней, команда
+# python manage.py archive_notes переносит в архивную БД. Дата изменения
+# появилась в миграции 0007, и у заметок, созданных до неё, это время
+# миграции: более точного источника нет. Поэтому первые заметки станут
+# кандидатами не раньше чем через ARCHIVE_AFTER_DAYS после её применения.
+ARCHIVE_AFTER_DAYS = 365
+
+# Фоновые задачи (notes.queue), воркер: python manage.py run_workers.
+TASK_QUEUE_MAX_ATTEMPTS = 5
+# Задержка перед повтором упавшей задачи, удваивается с каждой попыткой.
+TASK_QUEUE_RETRY_DELAY = 10
+# Задачи заметки ждут столько секунд, чтобы серия правок слилась в одну.
+TASK_QUEUE_NOTE_DELAY = 2
+# Задача в статусе running дольше этого срока считается брошенной.
+TASK_QUEUE_STALE_TIMEOUT = 600
+
 
 LANGUAGE_CODE = 'ru'
 
@@ -83,6 +228,26 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATICFILES_DIRS = [BASE_DIR / 'static']
+
+# Сюда collectstatic складывает файлы с отпечатками и их сжатые копии.
+STATIC_ROOT = BASE_DIR / 'collected_static'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'notes.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Ссылаться на файлы без отпечатка, если collectstatic ещё не запускали.
+# Только в режиме разработки: без DEBUG отсутствие манифеста - ошибка
+# развёртывания. Значение берётся при загрузке настроек, потому что
+# тестовые раннеры выключают DEBUG уже после неё.
+STATICFILES_ALLOW_UNHASHED = DEBUG
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
@@ -1,8 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth import views as auth_views
-from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path
-from django.views.generic import CreateView
+
+from notes import views
 
 urlpatterns = [
     path('', include('notes.urls')),
@@ -12,7 +12,7 @@ urlpatterns = [
 auth_urls = ([
     path(
         'login/',
-        auth_views.LoginView.as_view(),
+        views.Login.as_view(),
         name='login',
     ),
     path(
@@ -24,11 +24,7 @@ auth_urls = ([
     ),
     path(
         'signup/',
-        CreateView.as_view(
-            form_class=UserCreationForm,
-            success_url='/',
-            template_name='registration/signup.html',
-        ),
+        views.SignUp.as_view(),
         name='signup'
     ),
 ], 'users')